@@ -0,0 +1,134 @@
+"""
+Micro-benchmark de core.functions: costo por punto de la versión vectorizada
+(un lote (m, n) en una sola llamada) frente a la implementación anterior
+(builtin sum / list comprehension, un punto por llamada).
+
+Uso:
+    python benchmarks/bench_functions.py
+    python benchmarks/bench_functions.py --sizes 1x10000 10000x10 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from core import functions
+
+
+# Implementaciones anteriores, como referencia
+def legacy_quadratic(x, A=None, b=None, c=0):
+    A = A if A is not None else np.eye(len(x))
+    b = b if b is not None else np.zeros(len(x))
+    return float(0.5 * x.T @ A @ x + b.T @ x + c)
+
+
+def legacy_rosenbrock(x, a=1, b=100):
+    return sum(b * (x[1:] - x[:-1] ** 2) ** 2 + (a - x[:-1]) ** 2)
+
+
+def legacy_rastrigin(x, A=10):
+    n = len(x)
+    return A * n + sum(x**2 - A * np.cos(2 * np.pi * x))
+
+
+def legacy_himmelblau(x):
+    x1, x2 = x
+    return (x1**2 + x2 - 11) ** 2 + (x1 + x2**2 - 7) ** 2
+
+
+def legacy_ackley(x, a=20, b=0.2, c=2 * np.pi):
+    n = len(x)
+    term1 = -a * np.exp(-b * np.sqrt(np.sum(x**2) / n))
+    term2 = -np.exp(np.sum(np.cos(c * x)) / n)
+    return term1 + term2 + a + np.exp(1)
+
+
+def legacy_griewank(x):
+    sum_term = np.sum(x**2) / 4000
+    prod_term = np.prod([np.cos(x[i] / np.sqrt(i + 1)) for i in range(len(x))])
+    return 1 + sum_term - prod_term
+
+
+CASES = {
+    "quadratic": (functions.quadratic, legacy_quadratic),
+    "rosenbrock": (functions.rosenbrock, legacy_rosenbrock),
+    "rastrigin": (functions.rastrigin, legacy_rastrigin),
+    "himmelblau": (functions.himmelblau, legacy_himmelblau),
+    "ackley": (functions.ackley, legacy_ackley),
+    "griewank": (functions.griewank, legacy_griewank),
+}
+
+# La versión anterior de quadratic construye np.eye(n): se omite cuando n es grande
+LEGACY_QUADRATIC_MAX_N = 2000
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench(name, m, n, repeat, legacy_rows):
+    new, legacy = CASES[name]
+    if name == "himmelblau":
+        n = 2
+    rng = np.random.default_rng(0)
+    X = rng.uniform(-2, 2, size=(m, n))
+
+    if m == 1:
+        t_new = best_time(lambda: new(X[0]), repeat)
+    else:
+        t_new = best_time(lambda: new(X), repeat)
+
+    t_old = None
+    if not (name == "quadratic" and n > LEGACY_QUADRATIC_MAX_N):
+        # La versión anterior solo evalúa un punto por llamada: se mide sobre
+        # un subconjunto de filas y se extrapola por punto.
+        rows = X[: min(m, legacy_rows)]
+        t_old = best_time(lambda: [legacy(x) for x in rows], repeat) / len(rows) * m
+
+    return n, t_new / m, None if t_old is None else t_old / m
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=["1x10000", "10000x10", "10000x1000"],
+        help="tamaños mxn a medir (m puntos de dimensión n)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--legacy-rows",
+        type=int,
+        default=1000,
+        help="filas medidas con la versión anterior (se extrapola por punto)",
+    )
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'función':>11} | {'m':>6} | {'n':>6} | {'nuevo µs/pt':>12} | {'anterior µs/pt':>14} | {'x':>7}"
+    )
+    print("-" * 72)
+    for size in args.sizes:
+        m, n = (int(v) for v in size.lower().split("x"))
+        for name in CASES:
+            n_used, t_new, t_old = bench(name, m, n, args.repeat, args.legacy_rows)
+            old = f"{t_old * 1e6:>14.3f}" if t_old is not None else f"{'-':>14}"
+            speedup = f"{t_old / t_new:>7.1f}" if t_old is not None else f"{'-':>7}"
+            print(
+                f"{name:>11} | {m:>6} | {n_used:>6} | {t_new * 1e6:>12.3f} | {old} | {speedup}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Compara los backends de gradiente de core.gradients (sympy, autodiff y
+finite-diff) sobre expresiones de prueba en varias dimensiones: tiempo de
+compilación, tiempo por llamada de ∇f y error máximo frente al gradiente
+analítico de core.problems.
+
+Uso:
+    python benchmarks/bench_gradients.py
+    python benchmarks/bench_gradients.py --dims 10 100 500 --backends autodiff finite-diff
+    python benchmarks/bench_gradients.py --disk-cache   # compilar = cargar de disco
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from core import codecache
+from core.gradients import GRADIENT_BACKENDS, compile_objective, invalidate_cache
+from core.problems import get_problem
+
+
+def rosenbrock_expression(names):
+    return " + ".join(
+        f"100*({b} - {a}**2)**2 + (1 - {a})**2" for a, b in zip(names, names[1:])
+    )
+
+
+def rastrigin_expression(names):
+    terms = " + ".join(f"{v}**2 - 10*cos(2*pi*{v})" for v in names)
+    return f"{10 * len(names)} + {terms}"
+
+
+def ackley_expression(names):
+    n = len(names)
+    squares = " + ".join(f"{v}**2" for v in names)
+    cosines = " + ".join(f"cos(2*pi*{v})" for v in names)
+    return f"-20*exp(-0.2*sqrt(({squares})/{n})) - exp(({cosines})/{n}) + 20 + E"
+
+
+def griewank_expression(names):
+    squares = " + ".join(f"{v}**2" for v in names)
+    product = "*".join(f"cos({v}/sqrt({i}))" for i, v in enumerate(names, 1))
+    return f"1 + ({squares})/4000 - {product}"
+
+
+EXPRESSIONS = {
+    "rosenbrock": rosenbrock_expression,
+    "rastrigin": rastrigin_expression,
+    "ackley": ackley_expression,
+    "griewank": griewank_expression,
+}
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench(name, n, backend, repeat):
+    names = [f"x{i}" for i in range(1, n + 1)]
+    expression = EXPRESSIONS[name](names)
+    invalidate_cache()
+    start = time.perf_counter()
+    compiled = compile_objective(expression, names, backend)
+    t_compile = time.perf_counter() - start
+
+    x = np.random.default_rng(n).uniform(-2, 2, size=n)
+    out = np.empty(n)
+    t_grad = best_time(lambda: compiled.array_gradient(x, out), repeat)
+    error = np.abs(compiled.array_gradient(x) - get_problem(name).gradient(x)).max()
+    return t_compile, t_grad, error
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dims", nargs="+", type=int, default=[2, 10, 50])
+    parser.add_argument("--functions", nargs="+", default=list(EXPRESSIONS))
+    parser.add_argument("--backends", nargs="+", default=list(GRADIENT_BACKENDS))
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument(
+        "--disk-cache",
+        action="store_true",
+        help="usar la caché en disco (por defecto se desactiva para medir la generación)",
+    )
+    args = parser.parse_args(argv)
+    if not args.disk_cache:
+        codecache.set_code_cache(None)
+
+    print(
+        f"{'función':>11} | {'n':>5} | {'backend':>11} | {'compilar s':>10} | "
+        f"{'∇f µs':>10} | {'error máx':>9}"
+    )
+    print("-" * 72)
+    for n in args.dims:
+        for name in args.functions:
+            for backend in args.backends:
+                t_compile, t_grad, error = bench(name, n, backend, args.repeat)
+                print(
+                    f"{name:>11} | {n:>5} | {backend:>11} | {t_compile:>10.3f} | "
+                    f"{t_grad * 1e6:>10.1f} | {error:>9.1e}"
+                )
+
+
+if __name__ == "__main__":
+    main()
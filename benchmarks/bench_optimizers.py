@@ -0,0 +1,246 @@
+"""
+Suite de rendimiento de los optimizadores: cruza los problemas de
+core.problems en varias dimensiones con cada método y búsqueda lineal, y mide
+tiempo, iteraciones, evaluaciones de f y ∇f, f final y memoria pico.
+
+Uso:
+    python benchmarks/bench_optimizers.py
+    python benchmarks/bench_optimizers.py --save benchmarks/optimizers_baseline.json
+    python benchmarks/bench_optimizers.py --compare benchmarks/optimizers_baseline.json
+    python benchmarks/bench_optimizers.py --problems rosenbrock --dims 2 100 --methods bfgs
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from core.problems import PROBLEMS, get_problem
+from core.runner import run_job
+
+METHODS = ["gradient_descent", "bfgs", "lbfgs", "newton_cg", "adam", "sgd"]
+LINE_SEARCHES = ["none", "armijo", "wolfe"]
+# Métodos que aceptan búsqueda lineal (el resto solo se mide con "none")
+USES_LINE_SEARCH = {"gradient_descent", "bfgs", "lbfgs", "newton_cg"}
+
+REFERENCE_PROBLEM = get_problem("rosenbrock")
+
+# Diferencias menores que estas se consideran ruido al comparar
+MIN_TIME_DELTA = 5e-3  # s
+MIN_MEMORY_DELTA = 64 * 1024  # bytes
+# Un caso que parece más lento se vuelve a medir al final de la suite, en
+# varias rondas separadas en el tiempo, antes de darlo por regresión: los picos
+# de carga duran segundos y varias corridas seguidas caen en el mismo pico
+CONFIRM_REPEAT = 10
+CONFIRM_ROUNDS = 3
+# Casos recientes cuya referencia se promedia (mediana): una medición aislada
+# de la referencia durante un pico de carga no deforma la normalización
+REFERENCE_WINDOW = 7
+
+
+def cases(problems, dims, methods, line_searches):
+    for problem in problems:
+        dimension = PROBLEMS[problem][3]
+        for n in [dimension] if dimension else dims:
+            for method in methods:
+                for line_search in line_searches:
+                    if line_search != "none" and method not in USES_LINE_SEARCH:
+                        continue
+                    yield problem, n, method, line_search
+
+
+def make_job(problem, n, method, line_search, max_iter):
+    rng = np.random.default_rng(n)  # mismo x0 para todos los métodos
+    return {
+        "id": f"{problem}/{n}/{method}/{line_search}",
+        "function": problem,
+        "method": method,
+        "line_search": line_search,
+        "x0": rng.uniform(-2, 2, size=n).tolist(),
+        "options": {"max_iter": max_iter},
+    }
+
+
+def run(job):
+    np.random.seed(0)  # el ruido de SGD es reproducible entre corridas
+    return run_job(job)
+
+
+def reference_workload():
+    """
+    Carga fija que se cronometra junto a cada caso: la velocidad efectiva de
+    la máquina varía (frecuencia, otros procesos) y al comparar los tiempos
+    se escalan por el cociente de las referencias.
+    """
+    problem = REFERENCE_PROBLEM
+    x = np.linspace(-2, 2, 100)
+    start = time.perf_counter()
+    for _ in range(200):
+        problem.value_and_grad(x)
+    return time.perf_counter() - start
+
+
+def bench(job, repeat):
+    results, references = [], []
+    with np.errstate(all="ignore"):
+        for _ in range(repeat):
+            results.append(run(job))
+            references.append(reference_workload())
+        # La memoria se mide aparte: tracemalloc distorsiona el tiempo
+        tracemalloc.start()
+        run(job)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    result = results[0]
+    return {
+        "id": job["id"],
+        "time": min(r["time"] for r in results),
+        "reference": min(references),
+        "iterations": result["iterations"],
+        "f_evals": result["f_evals"],
+        "grad_evals": result["grad_evals"],
+        "f": result["f"],
+        "peak_memory": peak,
+    }
+
+
+def smoothed(record, recent):
+    """Sustituye la referencia de record por la mediana de las más recientes."""
+    recent.append(record["reference"])
+    record["reference"] = float(np.median(recent))
+    return record
+
+
+def normalized_time(record, baseline):
+    """Tiempo de record llevado a la velocidad de la máquina de baseline."""
+    if "reference" not in baseline:
+        return record["time"]  # línea base anterior a la normalización
+    return record["time"] * baseline["reference"] / record["reference"]
+
+
+def time_regressed(record, baseline, tolerance):
+    old, new = baseline["time"], normalized_time(record, baseline)
+    return new > old * (1 + tolerance) and new - old > MIN_TIME_DELTA
+
+
+def compare(record, baseline, tolerance, time_tolerance):
+    """Lista de regresiones de record respecto a su línea base."""
+    regressions = []
+    old, new = baseline["time"], normalized_time(record, baseline)
+    if time_regressed(record, baseline, time_tolerance):
+        regressions.append(f"time {old * 1e3:.2f} -> {new * 1e3:.2f} ms")
+    for key in ("iterations", "f_evals", "grad_evals"):
+        old, new = baseline[key], record[key]
+        if new > old * (1 + tolerance):
+            regressions.append(f"{key} {old} -> {new}")
+    old, new = baseline["peak_memory"], record["peak_memory"]
+    if new > old * (1 + tolerance) and new - old > MIN_MEMORY_DELTA:
+        regressions.append(f"peak_memory {old} -> {new}")
+    old, new = baseline["f"], record["f"]
+    if np.isfinite(old) and not new <= old + tolerance * max(abs(old), 1e-8):
+        regressions.append(f"f {old:.3e} -> {new:.3e}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--problems", nargs="+", default=list(PROBLEMS))
+    parser.add_argument("--dims", nargs="+", type=int, default=[2, 10, 100])
+    parser.add_argument("--methods", nargs="+", default=METHODS)
+    parser.add_argument("--line-searches", nargs="+", default=LINE_SEARCHES)
+    parser.add_argument("--max-iter", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="guarda los resultados como línea base (JSON)")
+    parser.add_argument("--compare", help="compara con una línea base (JSON)")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="empeoramiento relativo permitido con --compare",
+    )
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.5,
+        help="empeoramiento relativo del tiempo permitido con --compare (el "
+        "tiempo varía de un proceso a otro mucho más que los contadores)",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = {record["id"]: record for record in json.load(file)}
+
+    print(
+        f"{'caso':<40} | {'ms':>9} | {'iter':>5} | {'f evals':>7} | "
+        f"{'∇f evals':>8} | {'f final':>10} | {'KiB':>8}"
+    )
+    print("-" * 106)
+    records = []
+    suspects = {}  # posición en records -> job de los casos que parecen más lentos
+    recent = deque(maxlen=REFERENCE_WINDOW)
+    start = time.perf_counter()
+    for case in cases(args.problems, args.dims, args.methods, args.line_searches):
+        job = make_job(*case, args.max_iter)
+        record = smoothed(bench(job, args.repeat), recent)
+        base = baseline.get(record["id"])
+        if base and time_regressed(record, base, args.time_tolerance):
+            suspects[len(records)] = job
+        records.append(record)
+        print(
+            f"{record['id']:<40} | {record['time'] * 1e3:>9.2f} | "
+            f"{record['iterations']:>5} | {record['f_evals']:>7} | "
+            f"{record['grad_evals']:>8} | {record['f']:>10.3e} | "
+            f"{record['peak_memory'] / 1024:>8.1f}"
+        )
+
+    for _ in range(CONFIRM_ROUNDS):
+        for i, job in list(suspects.items()):
+            base = baseline[job["id"]]
+            retry = smoothed(bench(job, max(CONFIRM_REPEAT, args.repeat)), recent)
+            if normalized_time(retry, base) < normalized_time(records[i], base):
+                records[i] = retry
+            if not time_regressed(records[i], base, args.time_tolerance):
+                del suspects[i]
+    print(f"\n{len(records)} casos en {time.perf_counter() - start:.1f} s")
+
+    regressions = {}
+    for record in records:
+        if record["id"] in baseline:
+            found = compare(
+                record, baseline[record["id"]], args.tolerance, args.time_tolerance
+            )
+            if found:
+                regressions[record["id"]] = found
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(records, file, indent=1)
+        print(f"línea base guardada en {args.save}")
+
+    if args.compare:
+        missing = len([r for r in records if r["id"] not in baseline])
+        if missing:
+            print(f"{missing} casos sin línea base")
+        if regressions:
+            print(
+                f"\nregresiones (tolerancia {args.tolerance:.0%}, "
+                f"tiempo {args.time_tolerance:.0%}):"
+            )
+            for case_id, found in regressions.items():
+                print(f"  {case_id}: {'; '.join(found)}")
+            sys.exit(1)
+        print("sin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Tiempo de arranque de la GUI: desglose de importaciones al estilo
+`python -X importtime` y tiempo hasta la primera ventana, con comparación
+contra una línea base guardada.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --save benchmarks/startup_baseline.json
+    python benchmarks/bench_startup.py --check benchmarks/startup_baseline.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Se ejecuta en un proceso nuevo para medir un arranque en frío de Python
+IMPORT_SCRIPT = "import main"
+WINDOW_SCRIPT = """
+import time
+start = time.perf_counter()
+import main
+app = main.OptimizerApp()
+app.update()
+print(time.perf_counter() - start)
+app.destroy()
+"""
+
+
+def run_python(args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True
+    )
+
+
+def import_times():
+    """
+    Importa main con -X importtime y devuelve {módulo: (propio, acumulado)}
+    en segundos, más el acumulado total de main.
+    """
+    result = run_python(["-X", "importtime", "-c", IMPORT_SCRIPT])
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        if not own.strip().isdigit():
+            continue  # encabezado
+        modules[name.strip()] = (int(own) / 1e6, int(cumulative) / 1e6)
+    return modules
+
+
+def time_to_first_window():
+    """Segundos hasta que la primera ventana se dibuja, o None sin pantalla."""
+    result = run_python(["-c", WINDOW_SCRIPT])
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure(repeat):
+    imports = [import_times() for _ in range(repeat)]
+    windows = [time_to_first_window() for _ in range(repeat)]
+    windows = [t for t in windows if t is not None]
+    return {
+        "import_main": statistics.median(m["main"][1] for m in imports),
+        "first_window": statistics.median(windows) if windows else None,
+        "modules": imports[-1],
+    }
+
+
+def report(result, top):
+    modules = result["modules"]
+    print(f"{'módulo':<40} | {'propio ms':>10} | {'acumulado ms':>12}")
+    print("-" * 68)
+    ranked = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (own, cumulative) in ranked[:top]:
+        print(f"{name:<40} | {own * 1e3:>10.1f} | {cumulative * 1e3:>12.1f}")
+
+    print(f"\nimport main (mediana): {result['import_main'] * 1e3:.1f} ms")
+    if result["first_window"] is None:
+        print("primera ventana: no disponible (sin pantalla)")
+    else:
+        print(f"primera ventana (mediana): {result['first_window'] * 1e3:.1f} ms")
+
+    heavy = [name for name in ("sympy", "matplotlib.pyplot") if name in modules]
+    if heavy:
+        print(f"aviso: se importan al arrancar: {', '.join(heavy)}")
+
+
+def check(result, baseline, tolerance):
+    """Devuelve las métricas que empeoraron más de tolerance respecto a baseline."""
+    regressions = []
+    for key in ("import_main", "first_window"):
+        old, new = baseline.get(key), result[key]
+        if old is None or new is None:
+            continue
+        if new > old * (1 + tolerance):
+            regressions.append(f"{key}: {old * 1e3:.1f} ms -> {new * 1e3:.1f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="módulos a listar")
+    parser.add_argument("--save", help="guarda la medición como línea base (JSON)")
+    parser.add_argument("--check", help="compara con una línea base (JSON)")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="empeoramiento relativo permitido con --check",
+    )
+    args = parser.parse_args(argv)
+
+    result = measure(args.repeat)
+    report(result, args.top)
+
+    summary = {key: result[key] for key in ("import_main", "first_window")}
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+        print(f"\nlínea base guardada en {args.save}")
+
+    if args.check:
+        with open(args.check, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = check(result, baseline, args.tolerance)
+        if regressions:
+            print("\nregresión de arranque:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nsin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
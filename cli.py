@@ -0,0 +1,104 @@
+"""
+Ejecuta trabajos de optimización sin interfaz gráfica a partir de un archivo
+JSON o TOML y escribe una línea JSON de resultados por trabajo.
+
+Uso:
+    python cli.py jobs.toml
+    python cli.py jobs.json --workers 8 --output results.jsonl
+
+Formato del archivo (TOML; en JSON las mismas claves):
+
+    [defaults]                # opcional: se aplica a todos los trabajos
+    method = "bfgs"
+    line_search = "wolfe"
+    options = { tol = 1e-8, max_iter = 500 }
+
+    [[jobs]]
+    id = "rosen-2d"
+    expression = "(1 - x)**2 + 100*(y - x**2)**2"
+    variables = ["x", "y"]
+    gradient = "autodiff"     # "sympy" (por defecto), "autodiff" o "finite-diff"
+    x0 = [-1.2, 1.0]
+
+    [[jobs]]
+    function = "rastrigin"    # problema de core.problems
+    params = { A = 10 }
+    method = "adam"
+    x0 = [0.5, -0.3, 0.2]
+    options = { learning_rate = 0.05 }
+
+    [[jobs]]
+    function = "rosenbrock"
+    method = "newton_cg"
+    hessian = "sparse"        # Hessiana CSR coloreada en lugar de productos H·v
+    x0 = [1.5, 1.5, 1.5, 1.5, 1.5, 1.5]
+
+En JSON también se acepta directamente una lista de trabajos.
+
+El código generado de cada expresión se reutiliza entre ejecuciones y
+procesos a través de la caché en disco de core.codecache
+($OPTIMIZATION_CODE_CACHE; vacío la desactiva).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from core.parallel import run_jobs
+
+
+def load_jobs(path):
+    """Lee el archivo de trabajos y aplica los valores de [defaults]."""
+    if path.endswith(".toml"):
+        import tomllib
+
+        with open(path, "rb") as file:
+            data = tomllib.load(file)
+    else:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+
+    if isinstance(data, list):
+        data = {"jobs": data}
+    defaults = data.get("defaults", {})
+    jobs = []
+    for job in data.get("jobs", []):
+        merged = {**defaults, **job}
+        merged["options"] = {**defaults.get("options", {}), **job.get("options", {})}
+        jobs.append(merged)
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("jobs", help="archivo de trabajos (.json o .toml)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="procesos en paralelo (1 = en este proceso y en orden; 0 = todos los núcleos)",
+    )
+    parser.add_argument("--output", help="archivo de salida (por defecto, stdout)")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.jobs)
+    workers = args.workers or os.cpu_count() or 1
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    try:
+        for result in run_jobs(jobs, workers):
+            failed += "error" in result
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if failed:
+        print(f"{failed} de {len(jobs)} trabajos fallaron", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import ast
+
+import numpy as np
+
+# Diferenciación automática en modo inverso sobre las mismas expresiones que
+# acepta sympify. La expresión se registra una sola vez en una cinta (tape):
+# una lista de operaciones en orden topológico, sin nodos repetidos y con las
+# subexpresiones constantes ya evaluadas. A partir de la cinta se genera código
+# NumPy con un barrido hacia adelante (valores) y uno hacia atrás (adjuntos),
+# cuyo tamaño es lineal en el de la expresión: no se construye ∇f simbólico.
+
+_BINARY = {
+    ast.Add: "add",
+    ast.Sub: "sub",
+    ast.Mult: "mul",
+    ast.Div: "div",
+    ast.Pow: "pow",
+}
+
+_FUNCTIONS = {
+    "sin": "sin",
+    "cos": "cos",
+    "tan": "tan",
+    "exp": "exp",
+    "log": "log",
+    "ln": "log",
+    "sqrt": "sqrt",
+    "abs": "abs",
+    "Abs": "abs",
+    "sinh": "sinh",
+    "cosh": "cosh",
+    "tanh": "tanh",
+    "asin": "asin",
+    "acos": "acos",
+    "atan": "atan",
+}
+
+_CONSTANTS = {"pi": np.pi, "E": np.e}
+
+_EVALUATE = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": np.divide,
+    "pow": np.power,
+    "neg": np.negative,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "exp": np.exp,
+    "log": np.log,
+    "sqrt": np.sqrt,
+    "abs": np.abs,
+    "sinh": np.sinh,
+    "cosh": np.cosh,
+    "tanh": np.tanh,
+    "asin": np.arcsin,
+    "acos": np.arccos,
+    "atan": np.arctan,
+}
+
+# Código del barrido hacia adelante: {0}, {1} son los argumentos
+_FORWARD = {
+    "add": "{0} + {1}",
+    "sub": "{0} - {1}",
+    "mul": "{0} * {1}",
+    "div": "{0} / {1}",
+    "pow": "{0} ** {1}",
+    "neg": "-{0}",
+    "sin": "numpy.sin({0})",
+    "cos": "numpy.cos({0})",
+    "tan": "numpy.tan({0})",
+    "exp": "numpy.exp({0})",
+    "log": "numpy.log({0})",
+    "sqrt": "numpy.sqrt({0})",
+    "abs": "numpy.abs({0})",
+    "sinh": "numpy.sinh({0})",
+    "cosh": "numpy.cosh({0})",
+    "tanh": "numpy.tanh({0})",
+    "asin": "numpy.arcsin({0})",
+    "acos": "numpy.arccos({0})",
+    "atan": "numpy.arctan({0})",
+}
+
+# Contribución al adjunto de cada argumento: {g} es el adjunto del nodo y {v}
+# su valor. La potencia se trata aparte (depende de qué argumento es constante)
+_ADJOINT = {
+    "add": ("{g}", "{g}"),
+    "sub": ("{g}", "-{g}"),
+    "mul": ("{g} * {1}", "{g} * {0}"),
+    "div": ("{g} / {1}", "-{g} * {v} / {1}"),
+    "neg": ("-{g}",),
+    "sin": ("{g} * numpy.cos({0})",),
+    "cos": ("-{g} * numpy.sin({0})",),
+    "tan": ("{g} * (1 + {v} * {v})",),
+    "exp": ("{g} * {v}",),
+    "log": ("{g} / {0}",),
+    "sqrt": ("{g} * 0.5 / {v}",),
+    "abs": ("{g} * numpy.sign({0})",),
+    "sinh": ("{g} * numpy.cosh({0})",),
+    "cosh": ("{g} * numpy.sinh({0})",),
+    "tanh": ("{g} * (1 - {v} * {v})",),
+    "asin": ("{g} / numpy.sqrt(1 - {0} * {0})",),
+    "acos": ("-{g} / numpy.sqrt(1 - {0} * {0})",),
+    "atan": ("{g} / (1 + {0} * {0})",),
+}
+
+
+def _literal(value) -> str:
+    value = float(value)
+    if np.isnan(value):
+        return "numpy.nan"
+    if np.isinf(value):
+        return "numpy.inf" if value > 0 else "(-numpy.inf)"
+    return repr(value) if value >= 0 else f"({value!r})"
+
+
+class Tape:
+    """
+    Cinta de operaciones de una expresión.
+
+    Cada nodo es (op, args): "var" con el índice de la variable, "const" con
+    su valor, o una operación con los índices de sus argumentos (siempre
+    anteriores al nodo). Los nodos 0..n-1 son las variables y output es el
+    nodo de f.
+    """
+
+    def __init__(self, variables):
+        self.variables = tuple(variables)
+        self.nodes = []
+        self._index = {}
+        for i in range(len(self.variables)):
+            self.push("var", i)
+        self.output = None
+
+    def push(self, op: str, *args) -> int:
+        if op not in ("var", "const") and all(
+            self.nodes[a][0] == "const" for a in args
+        ):
+            with np.errstate(all="ignore"):
+                value = _EVALUATE[op](*(np.float64(self.nodes[a][1][0]) for a in args))
+            return self.push("const", float(value))
+
+        key = (op, args)
+        index = self._index.get(key)
+        if index is None:
+            index = len(self.nodes)
+            self.nodes.append(key)
+            self._index[key] = index
+        return index
+
+    def is_constant(self, index: int) -> bool:
+        return self.nodes[index][0] == "const"
+
+    def _reachable(self) -> list[int]:
+        """Índices de los nodos de operación de los que depende f, en orden."""
+        needed = {self.output}
+        for index in range(self.output, -1, -1):
+            op, args = self.nodes[index]
+            if index in needed and op not in ("var", "const"):
+                needed.update(args)
+        return [
+            index
+            for index in sorted(needed)
+            if self.nodes[index][0] not in ("var", "const")
+        ]
+
+    def _name(self, index: int) -> str:
+        op, args = self.nodes[index]
+        if op == "var":
+            return f"x[{args[0]}]"
+        if op == "const":
+            return _literal(args[0])
+        return f"_v{index}"
+
+    def _forward_lines(self, order) -> list[str]:
+        lines = []
+        for index in order:
+            op, args = self.nodes[index]
+            code = _FORWARD[op].format(*(self._name(a) for a in args))
+            lines.append(f"    _v{index} = {code}")
+        return lines
+
+    def _adjoint_terms(self, index: int):
+        """(argumento, contribución) del nodo index a los adjuntos de sus argumentos."""
+        op, args = self.nodes[index]
+        names = [self._name(a) for a in args]
+        fields = {"g": f"_g{index}", "v": self._name(index)}
+
+        if op == "pow":
+            base, exponent = args
+            if self.is_constant(exponent):
+                c = self.nodes[exponent][1][0]
+                if c == 2:
+                    term = "{g} * 2.0 * {0}"
+                else:
+                    term = "{g} * " + _literal(c) + " * {0} ** " + _literal(c - 1)
+                templates = (term, None)
+            else:
+                templates = (
+                    "{g} * {1} * {0} ** ({1} - 1)",
+                    "{g} * {v} * numpy.log({0})",
+                )
+        else:
+            templates = _ADJOINT[op]
+
+        for arg, template in zip(args, templates):
+            if template is not None and not self.is_constant(arg):
+                yield arg, template.format(*names, **fields)
+
+    def _reverse_lines(self, order) -> tuple[list[str], set]:
+        lines = [f"    _g{self.output} = 1.0"]
+        assigned = {self.output}
+        for index in reversed(order):
+            if index not in assigned:
+                continue  # f no depende de este nodo a través de las variables
+            for arg, term in self._adjoint_terms(index):
+                if arg in assigned:
+                    lines.append(f"    _g{arg} = _g{arg} + {term}")
+                else:
+                    lines.append(f"    _g{arg} = {term}")
+                    assigned.add(arg)
+        return lines, assigned
+
+    def source(self) -> str:
+        """
+        Genera el código fuente NumPy de value, gradient y value_and_grad en la
+        convención nativa sobre arreglos (la misma que core.gradients).
+        """
+        order = self._reachable()
+        forward = self._forward_lines(order)
+        f_code = self._name(self.output)
+        reverse, assigned = self._reverse_lines(order)
+        grad_lines = [
+            f"    out[{i}] = {f'_g{i}' if i in assigned else '0.0'}"
+            for i in range(len(self.variables))
+        ]
+        grad_alloc = [
+            "    if out is None:",
+            "        out = numpy.empty(numpy.shape(x))",
+        ]
+
+        source = ["import numpy", "", ""]
+        source += ["def value(x):", *forward, f"    return {f_code}", "", ""]
+        source += ["def gradient(x, out=None):", *grad_alloc, *forward, *reverse]
+        source += [*grad_lines, "    return out", "", ""]
+        source += ["def value_and_grad(x, out=None):", *grad_alloc, *forward]
+        source += [*reverse, *grad_lines, f"    return {f_code}, out", ""]
+        return "\n".join(source)
+
+
+def _children(node) -> list:
+    if isinstance(node, ast.BinOp):
+        return [node.left, node.right]
+    if isinstance(node, ast.UnaryOp):
+        return [node.operand]
+    if isinstance(node, ast.Call):
+        return list(node.args)
+    return []
+
+
+def _record(tape: Tape, node, args: list[int], variables: dict) -> int:
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        return tape.push(_BINARY[type(node.op)], *args)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        return tape.push("neg", *args) if isinstance(node.op, ast.USub) else args[0]
+    if isinstance(node, ast.Call):
+        name = getattr(node.func, "id", None)
+        if name not in _FUNCTIONS:
+            raise ValueError(
+                f"Función no soportada por autodiff: {ast.unparse(node.func)}"
+            )
+        if len(args) != 1 or node.keywords:
+            raise ValueError(f"{name} debe recibir un único argumento.")
+        return tape.push(_FUNCTIONS[name], *args)
+    if isinstance(node, ast.Name):
+        if node.id in variables:
+            return variables[node.id]
+        if node.id in _CONSTANTS:
+            return tape.push("const", _CONSTANTS[node.id])
+        raise ValueError(f"Símbolo desconocido: {node.id}")
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return tape.push("const", float(node.value))
+    raise ValueError(f"Expresión no soportada por autodiff: {ast.unparse(node)}")
+
+
+def parse(func_str: str, variables: list[str]) -> Tape:
+    """
+    Registra en una cinta la expresión func_str (sintaxis de sympify: **, ^,
+    sin, cos, exp, log, sqrt, Abs, pi, E, ...) sobre las variables dadas.
+    """
+    try:
+        tree = ast.parse(func_str.replace("^", "**").strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Expresión inválida: {func_str}") from e
+
+    tape = Tape(variables)
+    indices = {name: i for i, name in enumerate(tape.variables)}
+    # Recorrido en postorden sin recursión: sumas y productos largos anidan
+    # cientos de niveles de BinOp
+    results = {}
+    stack = [(tree.body, False)]
+    while stack:
+        node, visited = stack.pop()
+        if visited:
+            args = [results.pop(id(child)) for child in _children(node)]
+            results[id(node)] = _record(tape, node, args, indices)
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(_children(node)))
+    tape.output = results[id(tree.body)]
+    return tape
+
+
+def array_source(func_str: str, variables: list[str]) -> str:
+    """Código fuente NumPy de value, gradient y value_and_grad por modo inverso."""
+    return parse(func_str, variables).source()
@@ -0,0 +1,215 @@
+import hashlib
+import importlib.util
+import os
+import py_compile
+import tempfile
+import threading
+
+# Caché en disco del código NumPy generado para los objetivos. Cada archivo se
+# nombra con el hash de su contenido lógico (expresión, variables y versión del
+# generador), así que nunca queda obsoleto: una entrada existe completa o no
+# existe. Las escrituras van a un temporal del mismo directorio y se publican
+# con os.replace (atómico), de modo que varios procesos pueden compartir el
+# directorio sin bloqueos; si dos escriben la misma clave, ambos escriben el
+# mismo contenido. Junto al fuente se guarda su bytecode sin verificación de
+# fecha: el mtime del fuente queda libre para ordenar la expulsión LRU.
+
+_DEFAULT_MAX_BYTES = 256 * 2**20
+_ENV_DIRECTORY = "OPTIMIZATION_CODE_CACHE"
+
+_settings_lock = threading.Lock()
+_settings = {}
+
+
+def default_directory():
+    """
+    Directorio por defecto: $OPTIMIZATION_CODE_CACHE si está definido (vacío
+    desactiva la caché) o <XDG_CACHE_HOME o ~/.cache>/optimization-playground/code.
+    """
+    directory = os.environ.get(_ENV_DIRECTORY)
+    if directory is not None:
+        return directory or None
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "optimization-playground", "code")
+
+
+def _current_settings():
+    with _settings_lock:
+        if not _settings:
+            _settings.update(directory=default_directory(), max_bytes=None)
+        return _settings["directory"], _settings["max_bytes"] or _DEFAULT_MAX_BYTES
+
+
+def set_code_cache(directory=..., max_bytes: int = None):
+    """
+    Configura la caché en disco para este proceso.
+
+    Parámetros:
+    - directory: directorio de la caché; None la desactiva y sin indicarlo se
+      mantiene el actual
+    - max_bytes: tamaño máximo (fuentes + bytecode); al superarlo se eliminan
+      las entradas usadas hace más tiempo
+    """
+    if max_bytes is not None and max_bytes < 1:
+        raise ValueError("max_bytes debe ser al menos 1.")
+    _current_settings()
+    with _settings_lock:
+        if directory is not ...:
+            _settings["directory"] = directory
+        if max_bytes is not None:
+            _settings["max_bytes"] = max_bytes
+
+
+def source_key(*parts: str) -> str:
+    """Clave de contenido (sha256 hexadecimal) de las partes dadas."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _paths(directory: str, key: str):
+    source_path = os.path.join(directory, f"{key}.py")
+    return source_path, importlib.util.cache_from_source(source_path)
+
+
+def _exec_source(source: str, filename: str) -> dict:
+    namespace = {}
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace
+
+
+def _import(source_path: str, key: str) -> dict:
+    spec = importlib.util.spec_from_file_location(f"_generated_{key[:16]}", source_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return vars(module)
+
+
+def _write_atomic(path: str, text: str):
+    directory = os.path.dirname(path)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def load_source(key: str, generate, filename: str = "<generated>") -> dict:
+    """
+    Ejecuta el código generado para key y devuelve su espacio de nombres.
+
+    Si la caché en disco tiene la entrada se importa directamente (con su
+    bytecode) sin llamar a generate; si no, se genera el fuente, se guarda y
+    se expulsan entradas antiguas si se supera el tamaño máximo. Cualquier
+    error de disco hace que se ejecute el fuente en memoria, como sin caché.
+
+    Parámetros:
+    - key: clave de contenido (ver source_key)
+    - generate: función sin argumentos que devuelve el código fuente
+    - filename: nombre para las trazas si el código no viene de disco
+    """
+    directory, max_bytes = _current_settings()
+    if directory is None:
+        return _exec_source(generate(), filename)
+
+    source_path, bytecode_path = _paths(directory, key)
+    try:
+        namespace = _import(source_path, key)
+        os.utime(source_path)  # marca de uso reciente para la expulsión LRU
+        return namespace
+    except FileNotFoundError:
+        pass  # no está, o la expulsó otro proceso
+    except (OSError, SyntaxError, ImportError, ValueError, EOFError):
+        _remove(source_path, bytecode_path)  # entrada ilegible: se regenera
+
+    source = generate()
+    try:
+        os.makedirs(os.path.dirname(bytecode_path), exist_ok=True)
+        _write_atomic(source_path, source)
+        py_compile.compile(
+            source_path,
+            cfile=bytecode_path,
+            doraise=True,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+        namespace = _import(source_path, key)
+    except (OSError, py_compile.PyCompileError):
+        return _exec_source(source, filename)
+    evict(max_bytes)
+    return namespace
+
+
+def _remove(*paths):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _entries(directory: str):
+    """(mtime, bytes, source_path, bytecode_path) de cada entrada en disco."""
+    entries = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return entries
+    for name in names:
+        if not name.endswith(".py"):
+            continue
+        source_path, bytecode_path = _paths(directory, name[:-3])
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            continue
+        size = stat.st_size
+        try:
+            size += os.stat(bytecode_path).st_size
+        except OSError:
+            pass
+        entries.append((stat.st_mtime, size, source_path, bytecode_path))
+    return entries
+
+
+def evict(max_bytes: int = None):
+    """
+    Elimina las entradas usadas hace más tiempo hasta que la caché ocupe como
+    mucho max_bytes (por defecto, el máximo configurado).
+    """
+    directory, default_max = _current_settings()
+    if directory is None:
+        return
+    max_bytes = default_max if max_bytes is None else max_bytes
+    entries = sorted(_entries(directory))
+    total = sum(size for _, size, _, _ in entries)
+    for _, size, source_path, bytecode_path in entries:
+        if total <= max_bytes:
+            break
+        _remove(source_path, bytecode_path)
+        total -= size
+
+
+def clear_code_cache():
+    """Vacía la caché en disco."""
+    evict(0)
+
+
+def code_cache_info() -> dict:
+    directory, max_bytes = _current_settings()
+    entries = _entries(directory) if directory is not None else []
+    return {
+        "directory": directory,
+        "entries": len(entries),
+        "bytes": sum(size for _, size, _, _ in entries),
+        "max_bytes": max_bytes,
+    }
@@ -0,0 +1,164 @@
+import numpy as np
+
+
+def array_native(func):
+    """
+    Marca func como función en la convención nativa sobre arreglos:
+    f(x), grad_f(x, out=None) o value_and_grad(x, out=None), con x un np.ndarray.
+    """
+    func.array_native = True
+    return func
+
+
+def is_array_native(func) -> bool:
+    return getattr(func, "array_native", False)
+
+
+def as_array_function(f):
+    """Adapta f(*x) a f(x). Si f ya es nativa se devuelve sin cambios."""
+    if f is None or is_array_native(f):
+        return f
+
+    @array_native
+    def function(x):
+        return f(*x)
+
+    return function
+
+
+def as_array_gradient(grad_f):
+    """Adapta grad_f(*x) a grad_f(x, out=None). Si ya es nativa se devuelve igual."""
+    if grad_f is None or is_array_native(grad_f):
+        return grad_f
+
+    @array_native
+    def gradient(x, out=None):
+        grad = grad_f(*x)
+        if out is None:
+            return np.array(grad, dtype=float)  # por si viene como lista sympy
+        out[:] = grad
+        return out
+
+    return gradient
+
+
+def as_array_value_and_grad(value_and_grad):
+    """Adapta value_and_grad(*x) a value_and_grad(x, out=None)."""
+    if value_and_grad is None or is_array_native(value_and_grad):
+        return value_and_grad
+
+    @array_native
+    def fused(x, out=None):
+        f_x, grad = value_and_grad(*x)
+        if out is None:
+            return f_x, np.array(grad, dtype=float)
+        out[:] = grad
+        return f_x, out
+
+    return fused
+
+
+def objective_evaluator(f, grad_f, value_and_grad=None):
+    """
+    Construye una función que evalúa f(x) y ∇f(x) en el mismo punto.
+
+    Parámetros:
+    - f: función objetivo f(*x) o f(x) nativa
+    - grad_f: gradiente ∇f(*x) o grad_f(x, out) nativo
+    - value_and_grad: función fusionada value_and_grad(*x) o value_and_grad(x, out), opcional
+
+    Retorna:
+    - evaluate: función evaluate(x, out=None) -> (f(x), ∇f(x)). Si se pasa out,
+      el gradiente se escribe en ese arreglo. Si hay una forma fusionada se usa
+      una sola llamada por punto.
+    """
+    if value_and_grad is not None:
+        return as_array_value_and_grad(value_and_grad)
+
+    function = as_array_function(f)
+    gradient = as_array_gradient(grad_f)
+
+    @array_native
+    def evaluate(x, out=None):
+        grad = gradient(x, out)
+        return function(x), grad
+
+    return evaluate
+
+
+def counting(func, counts: dict, *keys):
+    """
+    Envuelve func para sumar una llamada en counts[key] por cada key dada,
+    conservando la convención de llamada (nativa o desempaquetada).
+    """
+
+    def wrapped(*args, **kwargs):
+        for key in keys:
+            counts[key] += 1
+        return func(*args, **kwargs)
+
+    if is_array_native(func):
+        array_native(wrapped)
+    return wrapped
+
+
+def batch_native(func):
+    """
+    Marca func como función que evalúa un lote de puntos X con forma (k, n):
+    f(X) -> (k,), grad_f(X, out=None) -> (k, n), value_and_grad(X, out=None).
+    """
+    func.batch_native = True
+    return func
+
+
+def is_batch_native(func) -> bool:
+    return getattr(func, "batch_native", False)
+
+
+def as_batch_function(f):
+    """Adapta f a la forma por lotes; si no la soporta se evalúa fila por fila."""
+    if f is None or is_batch_native(f):
+        return f
+    function = as_array_function(f)
+
+    @batch_native
+    def batch_function(X):
+        return np.array([function(x) for x in X], dtype=float)
+
+    return batch_function
+
+
+def as_batch_value_and_grad(f, grad_f, value_and_grad=None):
+    """
+    Construye evaluate(X, out=None) -> (f(X) con forma (k,), ∇f(X) con forma (k, n)).
+
+    Usa las formas por lotes si existen (por ejemplo las de CompiledObjective);
+    en otro caso recorre las filas con la forma nativa sobre arreglos.
+    """
+    if value_and_grad is not None and is_batch_native(value_and_grad):
+        return value_and_grad
+
+    if is_batch_native(f) and is_batch_native(grad_f):
+
+        @batch_native
+        def evaluate(X, out=None):
+            out = grad_f(X, out)
+            return f(X), out
+
+        return evaluate
+
+    evaluate_one = objective_evaluator(f, grad_f, value_and_grad)
+
+    @batch_native
+    def evaluate_rows(X, out=None):
+        if out is None:
+            out = np.empty(np.shape(X))
+        f_vals = np.empty(len(X))
+        for i, x in enumerate(X):
+            row = out[i]
+            f_vals[i], grad = evaluate_one(x, row)
+            if grad is not row:
+                row[:] = grad
+        return f_vals, out
+
+    return evaluate_rows
@@ -1,19 +1,45 @@
+import math
+
 import numpy as np
 
+# Todas las funciones aceptan un punto x con forma (n,) o un lote de puntos
+# con forma (m, n); se evalúan sobre el último eje y devuelven un float o un
+# arreglo (m,) respectivamente. Un único punto toma un camino aparte con
+# productos escalares y math en lugar de reducciones por eje: los
+# optimizadores evalúan un punto por llamada y ahí domina el costo fijo.
+
+
+def _output(value):
+    return float(value) if np.ndim(value) == 0 else value
+
 
 def quadratic(x: np.ndarray, A=None, b=None, c=0):
-    A = A if A is not None else np.eye(len(x))
-    b = b if b is not None else np.zeros(len(x))
-    return float(0.5 * x.T @ A @ x + b.T @ x + c)
+    x = np.asarray(x, dtype=float)
+    if A is None:
+        quad = np.einsum("...i,...i->...", x, x)  # xᵀ I x sin construir I
+    else:
+        quad = np.einsum("...i,...i->...", x @ np.asarray(A).T, x)
+    linear = x @ np.asarray(b, dtype=float) if b is not None else 0.0
+    return _output(0.5 * quad + linear + c)
 
 
 def rosenbrock(x: np.ndarray, a=1, b=100):
-    return sum(b * (x[1:] - x[:-1] ** 2) ** 2 + (a - x[:-1]) ** 2)
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 1:
+        head = x[:-1]
+        t = x[1:] - head * head
+        r = a - head
+        return float(b * (t @ t) + r @ r)
+    head = x[..., :-1]
+    return _output(np.sum(b * (x[..., 1:] - head**2) ** 2 + (a - head) ** 2, axis=-1))
 
 
 def rastrigin(x: np.ndarray, A=10):
-    n = len(x)
-    return A * n + sum(x**2 - A * np.cos(2 * np.pi * x))
+    x = np.asarray(x, dtype=float)
+    n = x.shape[-1]
+    if x.ndim == 1:
+        return float(A * n + x @ x - A * np.cos(2 * np.pi * x).sum())
+    return _output(A * n + np.sum(x**2 - A * np.cos(2 * np.pi * x), axis=-1))
 
 
 def himmelblau(x: np.ndarray):
@@ -22,10 +48,14 @@ def himmelblau(x: np.ndarray):
     f(x, y) = (x² + y - 11)² + (x + y² - 7)²
     Tiene múltiples mínimos locales.
     """
-    if len(x) != 2:
+    x = np.asarray(x, dtype=float)
+    if x.shape[-1] != 2:
         raise ValueError("Himmelblau function is only defined for 2D inputs.")
-    x1, x2 = x
-    return (x1**2 + x2 - 11) ** 2 + (x1 + x2**2 - 7) ** 2
+    if x.ndim == 1:
+        x1, x2 = x.tolist()
+    else:
+        x1, x2 = x[..., 0], x[..., 1]
+    return _output((x1**2 + x2 - 11) ** 2 + (x1 + x2**2 - 7) ** 2)
 
 
 def ackley(x: np.ndarray, a=20, b=0.2, c=2 * np.pi):
@@ -34,19 +64,126 @@ def ackley(x: np.ndarray, a=20, b=0.2, c=2 * np.pi):
     f(x) = -a * exp(-b * sqrt(sum(x_i^2)/n)) - exp(sum(cos(c*x_i))/n) + a + exp(1)
     Tiene mínimo global en x=0 con f(x)=0
     """
-    n = len(x)
-    sum_sq = np.sum(x**2)
-    sum_cos = np.sum(np.cos(c * x))
-    term1 = -a * np.exp(-b * np.sqrt(sum_sq / n))
-    term2 = -np.exp(sum_cos / n)
-    return term1 + term2 + a + np.exp(1)
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 1:
+        n = len(x)
+        term1 = -a * math.exp(-b * math.sqrt((x @ x) / n))
+        term2 = -math.exp(np.cos(c * x).sum() / n)
+        return term1 + term2 + a + math.e
+    mean_sq = np.mean(x**2, axis=-1)
+    mean_cos = np.mean(np.cos(c * x), axis=-1)
+    term1 = -a * np.exp(-b * np.sqrt(mean_sq))
+    term2 = -np.exp(mean_cos)
+    return _output(term1 + term2 + a + np.exp(1))
 
 
 def griewank(x: np.ndarray) -> float:
     """
-    Griewank function (2D version).
-    Global minimum at [0, 0] with f(x) = 0
+    Griewank function.
+    Global minimum at [0, 0, ...] with f(x) = 0
     """
-    sum_term = np.sum(x**2) / 4000
-    prod_term = np.prod([np.cos(x[i] / np.sqrt(i + 1)) for i in range(len(x))])
-    return 1 + sum_term - prod_term
+    x = np.asarray(x, dtype=float)
+    scale = np.sqrt(np.arange(1, x.shape[-1] + 1))
+    if x.ndim == 1:
+        return float(1 + (x @ x) / 4000 - np.cos(x / scale).prod())
+    sum_term = np.sum(x**2, axis=-1) / 4000
+    prod_term = np.prod(np.cos(x / scale), axis=-1)
+    return _output(1 + sum_term - prod_term)
+
+
+# Gradientes analíticos y productos Hessiana-vector (mismas convenciones de forma)
+
+
+def quadratic_gradient(x: np.ndarray, A=None, b=None, c=0):
+    x = np.asarray(x, dtype=float)
+    grad = x.copy() if A is None else 0.5 * (x @ np.asarray(A) + x @ np.asarray(A).T)
+    if b is not None:
+        grad += np.asarray(b, dtype=float)
+    return grad
+
+
+def quadratic_hvp(x: np.ndarray, v: np.ndarray, A=None, b=None, c=0):
+    v = np.asarray(v, dtype=float)
+    if A is None:
+        return v.copy()
+    return 0.5 * (v @ np.asarray(A) + v @ np.asarray(A).T)
+
+
+def rosenbrock_gradient(x: np.ndarray, a=1, b=100):
+    x = np.asarray(x, dtype=float)
+    head = x[..., :-1]
+    t = x[..., 1:] - head**2
+    grad = np.zeros_like(x)
+    grad[..., :-1] = -4 * b * head * t - 2 * (a - head)
+    grad[..., 1:] += 2 * b * t
+    return grad
+
+
+def rosenbrock_hvp(x: np.ndarray, v: np.ndarray, a=1, b=100):
+    """La Hessiana de Rosenbrock es tridiagonal: H v en O(n) sin formarla."""
+    x = np.asarray(x, dtype=float)
+    v = np.asarray(v, dtype=float)
+    head = x[..., :-1]
+    diag = np.zeros_like(x)
+    diag[..., :-1] = 12 * b * head**2 - 4 * b * x[..., 1:] + 2
+    diag[..., 1:] += 2 * b
+    off = -4 * b * head  # H[i, i+1] = H[i+1, i]
+    hv = diag * v
+    hv[..., :-1] += off * v[..., 1:]
+    hv[..., 1:] += off * v[..., :-1]
+    return hv
+
+
+def rastrigin_gradient(x: np.ndarray, A=10):
+    x = np.asarray(x, dtype=float)
+    return 2 * x + 2 * np.pi * A * np.sin(2 * np.pi * x)
+
+
+def rastrigin_hvp(x: np.ndarray, v: np.ndarray, A=10):
+    x = np.asarray(x, dtype=float)
+    return (2 + 4 * np.pi**2 * A * np.cos(2 * np.pi * x)) * np.asarray(v, dtype=float)
+
+
+def himmelblau_gradient(x: np.ndarray):
+    x = np.asarray(x, dtype=float)
+    if x.shape[-1] != 2:
+        raise ValueError("Himmelblau function is only defined for 2D inputs.")
+    x1, x2 = x[..., 0], x[..., 1]
+    u = x1**2 + x2 - 11
+    w = x1 + x2**2 - 7
+    return np.stack([4 * x1 * u + 2 * w, 2 * u + 4 * x2 * w], axis=-1)
+
+
+def himmelblau_hvp(x: np.ndarray, v: np.ndarray):
+    x = np.asarray(x, dtype=float)
+    v = np.asarray(v, dtype=float)
+    x1, x2 = x[..., 0], x[..., 1]
+    h11 = 12 * x1**2 + 4 * x2 - 42
+    h12 = 4 * x1 + 4 * x2
+    h22 = 4 * x1 + 12 * x2**2 - 26
+    v1, v2 = v[..., 0], v[..., 1]
+    return np.stack([h11 * v1 + h12 * v2, h12 * v1 + h22 * v2], axis=-1)
+
+
+def ackley_gradient(x: np.ndarray, a=20, b=0.2, c=2 * np.pi):
+    x = np.asarray(x, dtype=float)
+    n = x.shape[-1]
+    r = np.sqrt(np.mean(x**2, axis=-1, keepdims=True))
+    mean_cos = np.mean(np.cos(c * x), axis=-1, keepdims=True)
+    # En x = 0 el primer término no es diferenciable; se toma el subgradiente 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        radial = np.where(r > 0, a * b * np.exp(-b * r) / (n * r), 0.0)
+    return radial * x + (c / n) * np.exp(mean_cos) * np.sin(c * x)
+
+
+def griewank_gradient(x: np.ndarray):
+    x = np.asarray(x, dtype=float)
+    scale = np.sqrt(np.arange(1, x.shape[-1] + 1))
+    cos = np.cos(x / scale)
+    # Producto de los cosenos excepto el i-ésimo, con productos acumulados por
+    # izquierda y derecha para no dividir entre cosenos nulos
+    left = np.ones_like(cos)
+    right = np.ones_like(cos)
+    left[..., 1:] = np.cumprod(cos[..., :-1], axis=-1)
+    right[..., :-1] = np.cumprod(cos[..., :0:-1], axis=-1)[..., ::-1]
+    return x / 2000 + np.sin(x / scale) / scale * left * right
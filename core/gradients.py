@@ -1,17 +1,610 @@
+import functools
+import importlib.metadata
+import threading
+from collections import OrderedDict
+
 import numpy as np
-import sympy as sp
+
+from core import codecache
+from core.evaluation import array_native, as_batch_value_and_grad, batch_native
+from core.numdiff import numerical_gradient, numerical_value_and_grad
+from core.sparse import CSRMatrix, sparsity_pattern
+
+# sympy se importa dentro de cada función que lo usa: su carga (~0.5 s) domina
+# el arranque de la GUI y no hace falta hasta compilar la primera expresión.
 
 
 def symbolic_gradient(func_str: str, variables: list[str]):
+    import sympy as sp
+
     syms = sp.symbols(variables)
     expr = sp.sympify(func_str)
-    grad_exprs = [sp.diff(expr, var) for var in syms]
-    grad_func = sp.lambdify(syms, grad_exprs, "numpy")
-    return grad_func
+    return _lambdify_gradient(syms, expr)
 
 
 def symbolic_function(func_str: str, variables: list[str]):
+    import sympy as sp
+
     syms = sp.symbols(variables)
     expr = sp.sympify(func_str)
-    func = sp.lambdify(syms, expr, "numpy")
-    return func
+    return _lambdify_function(syms, expr)
+
+
+def symbolic_value_and_grad(func_str: str, variables: list[str]):
+    """
+    Compila f y ∇f a partir de un único grafo de expresiones con eliminación
+    de subexpresiones comunes (CSE), de modo que los términos compartidos se
+    calculan una sola vez por evaluación.
+
+    Retorna:
+    - value_and_grad: función value_and_grad(*x) -> (f(x), ∇f(x) como np.ndarray)
+    """
+    import sympy as sp
+
+    syms = sp.symbols(variables)
+    expr = sp.sympify(func_str)
+    return _lambdify_value_and_grad(syms, expr)
+
+
+def symbolic_array_functions(func_str: str, variables: list[str]):
+    """
+    Compila la forma nativa sobre arreglos de f y ∇f: reciben un único
+    np.ndarray x en lugar de x desempaquetado y escriben el gradiente en un
+    arreglo de salida preasignado.
+
+    Retorna:
+    - value: value(x) -> f(x)
+    - gradient: gradient(x, out=None) -> out con ∇f(x)
+    - value_and_grad: value_and_grad(x, out=None) -> (f(x), out)
+    """
+    import sympy as sp
+
+    syms = sp.symbols(variables)
+    expr = sp.sympify(func_str)
+    grad_exprs = [sp.diff(expr, var) for var in syms]
+    return _compile_array_functions(syms, expr, grad_exprs)
+
+
+def _lambdify_function(syms, expr):
+    import sympy as sp
+
+    return sp.lambdify(syms, expr, "numpy")
+
+
+def _lambdify_gradient(syms, expr, grad_exprs=None):
+    import sympy as sp
+
+    if grad_exprs is None:
+        grad_exprs = [sp.diff(expr, var) for var in syms]
+    return sp.lambdify(syms, grad_exprs, "numpy")
+
+
+def _lambdify_value_and_grad(syms, expr, grad_exprs=None):
+    import sympy as sp
+
+    if grad_exprs is None:
+        grad_exprs = [sp.diff(expr, var) for var in syms]
+    fused = sp.lambdify(syms, [expr, *grad_exprs], "numpy", cse=True)
+
+    def value_and_grad(*x):
+        f_x, *grad = fused(*x)
+        return f_x, np.array(grad, dtype=float)
+
+    return value_and_grad
+
+
+@functools.cache
+def _array_printer_class():
+    from sympy.printing.numpy import NumPyPrinter
+
+    class ArrayPrinter(NumPyPrinter):
+        """
+        Imprime cada variable como x[i] (y las de direction como v[i]) para
+        generar código sobre un arreglo.
+        """
+
+        def __init__(self, syms, direction=()):
+            super().__init__(
+                {
+                    "fully_qualified_modules": True,
+                    "inline": True,
+                    "allow_unknown_functions": True,
+                }
+            )
+            self._names = {sym: f"x[{i}]" for i, sym in enumerate(syms)}
+            self._names.update({sym: f"v[{i}]" for i, sym in enumerate(direction)})
+
+        def _print_Symbol(self, expr):
+            name = self._names.get(expr)
+            if name is not None:
+                return name
+            return super()._print_Symbol(expr)
+
+        def _print_DiracDelta(self, expr):
+            # Segunda derivada de Max, Min, Abs...: nula salvo en un conjunto
+            # de medida cero, que es lo que necesita la Hessiana numérica
+            return "0.0"
+
+    return ArrayPrinter
+
+
+def _cse_lines(printer, exprs):
+    import sympy as sp
+
+    replacements, reduced = sp.cse(exprs, symbols=sp.numbered_symbols("_t"))
+    lines = [
+        f"    {printer.doprint(sym)} = {printer.doprint(sub)}"
+        for sym, sub in replacements
+    ]
+    return lines, [printer.doprint(e) for e in reduced]
+
+
+def _module_header(printer) -> list[str]:
+    """
+    Importaciones de los módulos que usó printer (p. ej. functools para Max y
+    Min); numpy siempre, porque el código de asignación lo usa.
+    """
+    modules = {"numpy", *printer.module_imports}
+    return [f"import {module}" for module in sorted(modules)] + ["", ""]
+
+
+def _array_source(syms, expr, grad_exprs) -> str:
+    """
+    Genera el código fuente NumPy (con CSE) de value, gradient y
+    value_and_grad en la convención nativa sobre arreglos.
+    """
+    printer = _array_printer_class()(syms)
+    source = []
+
+    lines, (f_code,) = _cse_lines(printer, [expr])
+    source += ["def value(x):", *lines, f"    return {f_code}", "", ""]
+
+    grad_alloc = [
+        "    if out is None:",
+        "        out = numpy.empty(numpy.shape(x))",
+    ]
+    lines, grad_code = _cse_lines(printer, grad_exprs)
+    source += ["def gradient(x, out=None):", *grad_alloc, *lines]
+    source += [f"    out[{i}] = {code}" for i, code in enumerate(grad_code)]
+    source += ["    return out", "", ""]
+
+    lines, (f_code, *grad_code) = _cse_lines(printer, [expr, *grad_exprs])
+    source += ["def value_and_grad(x, out=None):", *grad_alloc, *lines]
+    source += [f"    out[{i}] = {code}" for i, code in enumerate(grad_code)]
+    source += [f"    return {f_code}, out", ""]
+    return "\n".join(_module_header(printer) + source)
+
+
+def _value_source(syms, expr) -> str:
+    """Genera el código fuente NumPy (con CSE) de value(x) solamente."""
+    printer = _array_printer_class()(syms)
+    lines, (f_code,) = _cse_lines(printer, [expr])
+    source = ["def value(x):", *lines, f"    return {f_code}", ""]
+    return "\n".join(_module_header(printer) + source)
+
+
+def _hvp_source(syms, grad_exprs) -> str:
+    """
+    Genera el código fuente NumPy (con CSE) de hvp(x, v, out=None) -> H(x) v
+    como derivada direccional del gradiente: H v = ∇(∇f · v). No se forma la
+    Hessiana: cada componente es una suma con un término por derivada no nula.
+    """
+    import sympy as sp
+
+    direction = sp.symbols([f"_v{i}" for i in range(len(syms))])
+    directional = sp.Add(*(g * v for g, v in zip(grad_exprs, direction)))
+    hvp_exprs = [sp.diff(directional, var) for var in syms]
+
+    printer = _array_printer_class()(syms, direction)
+    lines, hvp_code = _cse_lines(printer, hvp_exprs)
+    source = _module_header(printer)
+    source += [
+        "def hvp(x, v, out=None):",
+        "    if out is None:",
+        "        out = numpy.empty(numpy.shape(x))",
+        *lines,
+    ]
+    source += [f"    out[{i}] = {code}" for i, code in enumerate(hvp_code)]
+    source += ["    return out", ""]
+    return "\n".join(source)
+
+
+def hessian_sparsity(func_str: str, variables: list[str]):
+    """
+    Patrón de la Hessiana (grafo de interacción de las variables) derivado de
+    la expresión: x_j interactúa con x_i si aparece en ∂f/∂x_i.
+
+    Retorna:
+    - indptr, indices: patrón CSR simétrico (ver core.sparse)
+    """
+    import sympy as sp
+
+    syms = sp.symbols(list(variables))
+    expr = sp.sympify(func_str)
+    return _hessian_pattern(syms, [sp.diff(expr, var) for var in syms])
+
+
+def _hessian_pattern(syms, grad_exprs):
+    index = {sym: i for i, sym in enumerate(syms)}
+    rows, cols = [], []
+    for i, grad_expr in enumerate(grad_exprs):
+        for sym in grad_expr.free_symbols:
+            if sym in index:
+                rows.append(i)
+                cols.append(index[sym])
+    return sparsity_pattern(len(syms), rows, cols)
+
+
+def _hessian_values_source(syms, grad_exprs, upper_rows, upper_cols) -> str:
+    """
+    Genera el código fuente NumPy (con CSE) de values(x, out=None), que
+    escribe en out[k] la segunda derivada de la k-ésima entrada no nula del
+    triángulo superior.
+    """
+    import sympy as sp
+
+    exprs = [sp.diff(grad_exprs[i], syms[j]) for i, j in zip(upper_rows, upper_cols)]
+    printer = _array_printer_class()(syms)
+    lines, codes = _cse_lines(printer, exprs)
+    source = _module_header(printer)
+    source += [
+        "def values(x, out=None):",
+        "    if out is None:",
+        f"        out = numpy.empty({len(exprs)})",
+        *lines,
+    ]
+    source += [f"    out[{k}] = {code}" for k, code in enumerate(codes)]
+    source += ["    return out", ""]
+    return "\n".join(source)
+
+
+def _exec_array_source(source: str):
+    namespace = {}
+    exec(compile(source, "<array-objective>", "exec"), namespace)
+    return _array_functions(namespace)
+
+
+def _array_functions(namespace):
+    return tuple(
+        array_native(namespace[name])
+        for name in ("value", "gradient", "value_and_grad")
+    )
+
+
+# Versión del código generado: cambiarla invalida las entradas de la caché en
+# disco escritas por versiones anteriores de los generadores.
+_SOURCE_VERSION = "2"
+
+
+@functools.cache
+def _generator_version(generator: str) -> str:
+    if generator == "sympy":
+        return f"{_SOURCE_VERSION}-sympy-{importlib.metadata.version('sympy')}"
+    return f"{_SOURCE_VERSION}-{generator}"
+
+
+def _load_generated(func_str, variables, generator, kind, generate, filename):
+    """
+    Espacio de nombres del código generado de tipo kind ("objective", "value",
+    "hvp") para la expresión, a través de la caché en disco (core.codecache).
+    """
+    key = codecache.source_key(
+        func_str, ",".join(variables), kind, _generator_version(generator)
+    )
+    return codecache.load_source(key, generate, filename)
+
+
+def _compile_array_functions(syms, expr, grad_exprs):
+    return _exec_array_source(_array_source(syms, expr, grad_exprs))
+
+
+def _batch_functions(value, gradient, value_and_grad):
+    """
+    Formas por lotes de las funciones generadas. El código generado indexa
+    x[i] sobre el primer eje, así que un lote X (k, n) se evalúa como X.T y el
+    gradiente se escribe en out.T.
+    """
+
+    @batch_native
+    def batch_value(X):
+        return np.broadcast_to(value(X.T), X.shape[:1])
+
+    @batch_native
+    def batch_gradient(X, out=None):
+        if out is None:
+            out = np.empty(np.shape(X))
+        gradient(X.T, out.T)
+        return out
+
+    @batch_native
+    def batch_value_and_grad(X, out=None):
+        if out is None:
+            out = np.empty(np.shape(X))
+        f_vals, _ = value_and_grad(X.T, out.T)
+        return np.broadcast_to(f_vals, X.shape[:1]), out
+
+    return batch_value, batch_gradient, batch_value_and_grad
+
+
+GRADIENT_BACKENDS = ("sympy", "autodiff", "finite-diff")
+
+
+def _rows_gradient(batch_value_and_grad):
+    @batch_native
+    def batch_gradient(X, out=None):
+        return batch_value_and_grad(X, out)[1]
+
+    return batch_gradient
+
+
+def _unpacked_functions(value, gradient, value_and_grad):
+    """Formas f(*x) de las funciones nativas generadas."""
+
+    def function(*x):
+        return value(np.array(np.broadcast_arrays(*x), dtype=float))
+
+    def unpacked_gradient(*x):
+        return gradient(np.array(x, dtype=float))
+
+    def unpacked_value_and_grad(*x):
+        return value_and_grad(np.array(x, dtype=float))
+
+    return function, unpacked_gradient, unpacked_value_and_grad
+
+
+class CompiledObjective:
+    """
+    Resultado de compilar una expresión una sola vez.
+
+    El gradiente se obtiene según backend:
+    - "sympy": derivadas simbólicas con CSE
+    - "autodiff": modo inverso sobre la cinta de la expresión (core.autodiff),
+      sin construir ∇f simbólico; útil con sumas o productos largos
+    - "finite-diff": diferencias centrales sobre f (core.numdiff), con todas
+      las perturbaciones evaluadas como un único lote; solo se compila f, así
+      que admite cualquier expresión que acepte sympify
+
+    El código NumPy generado (f, ∇f y H·v) pasa por la caché en disco de
+    core.codecache: en una ejecución posterior se importa directamente, sin
+    sympify, diff ni CSE.
+
+    Atributos:
+    - func_str: expresión normalizada
+    - variables: tupla con los nombres de las variables
+    - backend: backend de gradiente usado
+    - function: f(*x)
+    - gradient: ∇f(*x)
+    - value_and_grad: forma fusionada value_and_grad(*x) -> (f(x), ∇f(x))
+    - array_function, array_gradient, array_value_and_grad: forma nativa
+      sobre arreglos (ver symbolic_array_functions)
+    - batch_function, batch_gradient, batch_value_and_grad: las mismas
+      funciones sobre un lote de puntos con forma (k, n)
+    - array_hvp: producto Hessiana-vector hvp(x, v, out=None) con el backend
+      "sympy" (se compila al primer acceso); None con los demás backends
+    - hessian_pattern: patrón CSR (indptr, indices) de la Hessiana ("sympy")
+    - sparse_hessian: hessian(x) -> core.sparse.CSRMatrix que evalúa solo las
+      entradas no nulas ("sympy"; se compila al primer acceso)
+    """
+
+    def __init__(
+        self, func_str: str, variables: tuple[str, ...], backend: str = "sympy"
+    ):
+        if backend not in GRADIENT_BACKENDS:
+            raise ValueError(f"Backend de gradiente desconocido: {backend}")
+        self.func_str = func_str
+        self.variables = variables
+        self.backend = backend
+
+        if backend == "finite-diff":
+            # Solo se compila f: el gradiente es numérico, así que vale toda
+            # expresión que acepte sympify (Max, atan2, floor...), aunque la
+            # cinta de autodiff no la sepa derivar
+            value = array_native(
+                _load_generated(
+                    func_str,
+                    variables,
+                    "sympy",
+                    "value",
+                    self._value_source,
+                    "<array-value>",
+                )["value"]
+            )
+            batch_value = _batch_functions(value, None, None)[0]
+            gradient = numerical_gradient(batch_value)
+            value_and_grad = numerical_value_and_grad(batch_value)
+        else:
+            value, gradient, value_and_grad = _array_functions(
+                _load_generated(
+                    func_str,
+                    variables,
+                    backend,
+                    "objective",
+                    functools.partial(self._objective_source, backend),
+                    "<array-objective>",
+                )
+            )
+        self.array_function = value
+        self.array_gradient = gradient
+        self.array_value_and_grad = value_and_grad
+        (
+            self.function,
+            self.gradient,
+            self.value_and_grad,
+        ) = _unpacked_functions(value, gradient, value_and_grad)
+        (
+            self.batch_function,
+            self.batch_gradient,
+            self.batch_value_and_grad,
+        ) = _batch_functions(
+            self.array_function, self.array_gradient, self.array_value_and_grad
+        )
+        if backend == "finite-diff":
+            # El gradiente numérico perturba un punto a la vez: los lotes de
+            # puntos se recorren por filas
+            self.batch_value_and_grad = as_batch_value_and_grad(
+                self.array_function, self.array_gradient, self.array_value_and_grad
+            )
+            self.batch_gradient = _rows_gradient(self.batch_value_and_grad)
+
+    def _value_source(self) -> str:
+        import sympy as sp
+
+        syms = sp.symbols(list(self.variables))
+        return _value_source(syms, sp.sympify(self.func_str))
+
+    def _objective_source(self, generator: str) -> str:
+        if generator == "autodiff":
+            from core import autodiff
+
+            return autodiff.array_source(self.func_str, self.variables)
+
+        import sympy as sp
+
+        syms = sp.symbols(list(self.variables))
+        expr = sp.sympify(self.func_str)
+        grad_exprs = [sp.diff(expr, var) for var in syms]
+        self._symbolic = syms, grad_exprs
+        return _array_source(syms, expr, grad_exprs)
+
+    @functools.cached_property
+    def _symbolic(self):
+        # Solo hace falta sympy si el código no vino de la caché en disco
+        import sympy as sp
+
+        syms = sp.symbols(list(self.variables))
+        expr = sp.sympify(self.func_str)
+        return syms, [sp.diff(expr, var) for var in syms]
+
+    @functools.cached_property
+    def array_hvp(self):
+        if self.backend != "sympy":
+            return None
+        namespace = _load_generated(
+            self.func_str,
+            self.variables,
+            "sympy",
+            "hvp",
+            lambda: _hvp_source(*self._symbolic),
+            "<array-hvp>",
+        )
+        return namespace["hvp"]
+
+    @functools.cached_property
+    def hessian_pattern(self):
+        if self.backend != "sympy":
+            return None
+        return _hessian_pattern(*self._symbolic)
+
+    @functools.cached_property
+    def sparse_hessian(self):
+        if self.backend != "sympy":
+            return None
+        indptr, indices = self.hessian_pattern
+        n = len(indptr) - 1
+        rows = np.repeat(np.arange(n), np.diff(indptr))
+        # Se derivan solo las entradas i <= j; la otra mitad es simétrica
+        upper = rows <= indices
+        position = np.cumsum(upper) - 1  # índice de cada (i, j) superior
+        lookup = dict(zip(zip(rows[upper], indices[upper]), position[upper]))
+        mirror = np.array(
+            [lookup[min(i, j), max(i, j)] for i, j in zip(rows, indices)],
+            dtype=np.intp,
+        )
+        namespace = {}
+        source = _hessian_values_source(*self._symbolic, rows[upper], indices[upper])
+        exec(compile(source, "<sparse-hessian>", "exec"), namespace)
+        values = namespace["values"]
+
+        def hessian(x):
+            return CSRMatrix(indptr, indices, values(x)[mirror])
+
+        return hessian
+
+    def surface(self, X, Y):
+        """
+        Evalúa f sobre una malla (X, Y) para graficar funciones de 2 variables.
+        Devuelve siempre un arreglo con la forma de X, aunque f sea constante.
+        """
+        Z = np.asarray(self.function(X, Y), dtype=float)
+        return np.broadcast_to(Z, np.shape(X))
+
+
+_CACHE_MAXSIZE = 32
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _cache_key(func_str: str, variables, backend: str = "sympy") -> tuple:
+    return "".join(func_str.split()), tuple(v.strip() for v in variables), backend
+
+
+def compile_objective(
+    func_str: str, variables: list[str], backend: str = "sympy"
+) -> CompiledObjective:
+    """
+    Devuelve la función, el gradiente y el evaluador para gráficas de una
+    expresión, reutilizando la compilación si ya está en la caché LRU.
+
+    La clave es la expresión sin espacios, la tupla de variables y el backend
+    de gradiente (ver CompiledObjective), así que "x**2 + y**2" y "x**2+y**2"
+    comparten entrada. Un fallo de la caché LRU aún puede evitar la
+    generación de código si la expresión está en la caché en disco
+    (core.codecache), compartida entre procesos y ejecuciones.
+    """
+    key = _cache_key(func_str, variables, backend)
+    with _cache_lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return compiled
+        _cache_stats["misses"] += 1
+
+    # La compilación se hace fuera del lock: sympify/diff pueden ser lentos
+    compiled = CompiledObjective(*key)
+
+    with _cache_lock:
+        _cache[key] = compiled
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_MAXSIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def invalidate_cache(func_str: str = None, variables: list[str] = None):
+    """
+    Elimina entradas de la caché de objetivos compilados.
+
+    Sin argumentos vacía la caché completa; con func_str elimina las entradas
+    de esa expresión (de todos los backends), solo las de esas variables si
+    también se da variables.
+    """
+    with _cache_lock:
+        if func_str is None:
+            _cache.clear()
+            return
+        expression, names, _ = _cache_key(func_str, variables or [])
+        for key in list(_cache):
+            if key[0] == expression and (variables is None or key[1] == names):
+                del _cache[key]
+
+
+def set_cache_size(maxsize: int):
+    global _CACHE_MAXSIZE
+    if maxsize < 1:
+        raise ValueError("El tamaño de la caché debe ser al menos 1.")
+    with _cache_lock:
+        _CACHE_MAXSIZE = maxsize
+        while len(_cache) > _CACHE_MAXSIZE:
+            _cache.popitem(last=False)
+
+
+def cache_info() -> dict:
+    with _cache_lock:
+        return {
+            "hits": _cache_stats["hits"],
+            "misses": _cache_stats["misses"],
+            "size": len(_cache),
+            "maxsize": _CACHE_MAXSIZE,
+        }
@@ -1,7 +1,21 @@
 import numpy as np
 
+from core.evaluation import as_array_function, as_array_gradient
 
-def armijo_backtracking(f, grad_f, x, d, alpha_init=1.0, rho=0.5, c=1e-4, max_iter=20):
+
+def armijo_backtracking(
+    f,
+    grad_f,
+    x,
+    d,
+    alpha_init=1.0,
+    rho=0.5,
+    c=1e-4,
+    max_iter=20,
+    f_x=None,
+    grad_x=None,
+    full_output=False,
+):
     """
     Búsqueda lineal por retroceso usando la condición de Armijo.
 
@@ -14,27 +28,46 @@ def armijo_backtracking(f, grad_f, x, d, alpha_init=1.0, rho=0.5, c=1e-4, max_it
     - rho: factor de reducción (típicamente 0.5)
     - c: constante de Armijo (típicamente 1e-4)
     - max_iter: máximo de reducciones del paso
+    - f_x, grad_x: f(x) y ∇f(x) ya calculados por el optimizador, opcionales
+    - full_output: si es True devuelve también los valores en el punto aceptado
 
     Retorna:
     - alpha: tamaño de paso aceptado
+    - (alpha, f_new, grad_new) si full_output=True. grad_new es None porque
+      Armijo no evalúa el gradiente en el punto aceptado.
     """
+    f, grad_f = as_array_function(f), as_array_gradient(grad_f)
     alpha = alpha_init
-    f_x = f(*x)
-    grad_x = np.array(grad_f(*x), dtype=float)
+    if f_x is None:
+        f_x = f(x)
+    if grad_x is None:
+        grad_x = grad_f(x)
     directional_derivative = np.dot(grad_x, d)
 
     for _ in range(max_iter):
         x_new = x + alpha * d
-        f_new = f(*x_new)
+        f_new = f(x_new)
         if f_new <= f_x + c * alpha * directional_derivative:
-            return alpha
+            return (alpha, f_new, None) if full_output else alpha
         alpha *= rho
 
-    return alpha  # devolver el último valor aunque no cumpla
+    # devolver el último valor aunque no cumpla (f no se evaluó en ese alpha)
+    return (alpha, None, None) if full_output else alpha
 
 
 def wolfe_line_search(
-    f, grad_f, x, d, alpha_init=1.0, c1=1e-4, c2=0.9, max_iter=20, rho=0.5
+    f,
+    grad_f,
+    x,
+    d,
+    alpha_init=1.0,
+    c1=1e-4,
+    c2=0.9,
+    max_iter=20,
+    rho=0.5,
+    f_x=None,
+    grad_x=None,
+    full_output=False,
 ):
     """
     Búsqueda lineal usando condiciones de Wolfe.
@@ -48,26 +81,38 @@ def wolfe_line_search(
     - c1, c2: constantes de Wolfe
     - max_iter: máximo de iteraciones
     - rho: factor de reducción del paso (si no cumple condiciones)
+    - f_x, grad_x: f(x) y ∇f(x) ya calculados por el optimizador, opcionales
+    - full_output: si es True devuelve también los valores en el punto aceptado
 
     Retorna:
     - alpha: tamaño de paso aceptado
+    - (alpha, f_new, grad_new) si full_output=True. Si no se cumplen las
+      condiciones, f_new y grad_new son None.
     """
+    f, grad_f = as_array_function(f), as_array_gradient(grad_f)
     alpha = alpha_init
-    grad_x = np.array(grad_f(*x), dtype=float)
-    phi0 = f(*x)
+    if grad_x is None:
+        grad_x = grad_f(x)
+    phi0 = f(x) if f_x is None else f_x
     phi0_prime = np.dot(grad_x, d)
+    grad_new = np.empty_like(grad_x)
 
     for _ in range(max_iter):
         x_new = x + alpha * d
-        phi = f(*x_new)
-        grad_new = np.array(grad_f(*x_new), dtype=float)
-        phi_prime = np.dot(grad_new, d)
+        phi = f(x_new)
 
         if phi > phi0 + c1 * alpha * phi0_prime:
-            alpha *= rho  # falla Armijo
-        elif phi_prime < c2 * phi0_prime:
+            alpha *= rho  # falla Armijo (no hace falta el gradiente)
+            continue
+
+        grad_new = grad_f(x_new, grad_new)
+        phi_prime = np.dot(grad_new, d)
+
+        if phi_prime < c2 * phi0_prime:
             alpha *= 1 / rho  # aumenta si no cumple curvatura
         else:
-            return alpha  # ambas condiciones satisfechas
+            # ambas condiciones satisfechas
+            return (alpha, phi, grad_new) if full_output else alpha
 
-    return alpha  # devuelve último alpha aunque no cumpla
+    # devuelve último alpha aunque no cumpla
+    return (alpha, None, None) if full_output else alpha
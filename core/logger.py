@@ -1,8 +1,77 @@
+import numpy as np
+
+from core.retention import make_policy
+
+
 class OptimizerLogger:
-    def __init__(self):
-        self._logs = []
+    """
+    Registro por iteración guardado en columnas NumPy preasignadas que crecen
+    al doble cuando se llenan.
+
+    Columnas escalares: iter, f_x, norm_grad y alpha (NaN si no aplica), más
+    una columna por cada dato adicional que envíe el método (p. ej.
+    skipped_updates en BFGS). Si store_x / store_grad están activos, los
+    puntos y gradientes se guardan como bloques 2-D (iteraciones, n).
+
+    Las propiedades (log.f_x, log.norm_grad, log.x, ...) devuelven vistas sin
+    copia de las filas usadas; dejan de reflejar nuevas iteraciones si el
+    arreglo interno crece, así que conviene pedirlas de nuevo tras la ejecución.
+
+    retention (ver core.retention) limita qué iteraciones se guardan: "every:10",
+    "log:20", "last:500", "improvement:1e-3" o una instancia de política. Con
+    una política de tamaño fijo (LastN o maxlen) las columnas son un buffer
+    circular que no crece; una vez que da la vuelta, las propiedades devuelven
+    copias ordenadas en lugar de vistas. La última iteración siempre se guarda.
+    """
+
+    def __init__(self, store_x=True, store_grad=True, capacity=1024, retention=None):
+        self.store_x = store_x
+        self.store_grad = store_grad
+        self.policy = make_policy(retention)
+        if self.policy.maxlen is not None:
+            # una fila extra para la última iteración aunque la política la descarte
+            capacity = self.policy.maxlen + 1
+        self._capacity = max(1, capacity)
+        self._start = 0  # fila física de la primera iteración guardada
+        self._size = 0  # iteraciones conservadas por la política
+        self._pending = False  # la fila siguiente guarda la última iteración
+        self._columns = {}
+        self._blocks = {}
+        self._allocate()
 
-    def __call__(self, iteration, x, f_x, grad_x, norm_grad, alpha=None):
+    def _allocate(self):
+        self._columns = {
+            "iter": np.zeros(self._capacity, dtype=np.int64),
+            "f_x": np.zeros(self._capacity),
+            "norm_grad": np.zeros(self._capacity),
+            "alpha": np.full(self._capacity, np.nan),
+        }
+        self._blocks = {}
+
+    def _grow(self, needed):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            if column.dtype.kind == "f":
+                grown = np.full(capacity, np.nan)
+            else:
+                grown = np.zeros(capacity, dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[name] = grown
+        for name, block in self._blocks.items():
+            grown = np.empty((capacity, block.shape[1]))
+            grown[: self._size] = block[: self._size]
+            self._blocks[name] = grown
+        self._capacity = capacity
+
+    def _block(self, name, n):
+        block = self._blocks.get(name)
+        if block is None:
+            block = self._blocks[name] = np.empty((self._capacity, n))
+        return block
+
+    def __call__(self, iteration, x, f_x, grad_x, norm_grad, alpha=None, **info):
         """
         Guarda los datos de una iteración de optimización.
 
@@ -13,32 +82,120 @@ class OptimizerLogger:
             grad_x (np.ndarray): Gradiente en el punto
             norm_grad (float): Norma del gradiente
             alpha (float | None): Tamaño de paso (si aplica)
+            **info: Datos adicionales del método (p. ej. skipped_updates en BFGS)
         """
-        self._logs.append(
-            {
-                "iter": iteration,
-                "x": x.copy(),
-                "f_x": f_x,
-                "grad": grad_x.copy(),
-                "norm_grad": norm_grad,
-                "alpha": alpha,
-            }
-        )
+        if self.policy.maxlen is None and self._size == self._capacity:
+            self._grow(self._size + 1)
+        i = (self._start + self._size) % self._capacity
+
+        columns = self._columns
+        columns["iter"][i] = iteration
+        columns["f_x"][i] = f_x
+        columns["norm_grad"][i] = norm_grad
+        columns["alpha"][i] = np.nan if alpha is None else alpha
+        for name, value in info.items():
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = np.full(self._capacity, np.nan)
+            column[i] = value
+
+        if self.store_x:
+            self._block("x", len(x))[i] = x
+        if self.store_grad:
+            self._block("grad", len(grad_x))[i] = grad_x
+
+        self._pending = not self.policy.keep(iteration, f_x)
+        if not self._pending:
+            if self._size == self.policy.maxlen:
+                self._start = (self._start + 1) % self._capacity
+            else:
+                self._size += 1
+
+    def __len__(self):
+        return self._size + self._pending
+
+    def __bool__(self):
+        # Un registro vacío sigue siendo un callback válido (`if callback:`)
+        return True
+
+    def column(self, name):
+        """Vista sin copia de una columna escalar o de un bloque (x, grad)."""
+        data = self._columns.get(name)
+        if data is None:
+            data = self._blocks.get(name)
+        if data is None:
+            return None
+        start, stop = self._start, self._start + len(self)
+        if stop <= self._capacity:
+            return data[start:stop]
+        return np.concatenate((data[start:], data[: stop - self._capacity]))
+
+    @property
+    def iter(self):
+        return self.column("iter")
+
+    @property
+    def f_x(self):
+        return self.column("f_x")
+
+    @property
+    def norm_grad(self):
+        return self.column("norm_grad")
+
+    @property
+    def alpha(self):
+        return self.column("alpha")
+
+    @property
+    def x(self):
+        return self.column("x")
+
+    @property
+    def grad(self):
+        return self.column("grad")
+
+    def columns(self) -> dict:
+        """Todas las columnas y bloques guardados, como vistas sin copia."""
+        names = list(self._columns) + list(self._blocks)
+        return {name: self.column(name) for name in names}
+
+    def save(self, path):
+        """Exporta las columnas a un archivo .npz."""
+        np.savez(path, **self.columns())
+
+    def _entry(self, j):
+        i = (self._start + j) % self._capacity
+        entry = {
+            "iter": int(self._columns["iter"][i]),
+            "x": self._blocks["x"][i] if "x" in self._blocks else None,
+            "f_x": float(self._columns["f_x"][i]),
+            "grad": self._blocks["grad"][i] if "grad" in self._blocks else None,
+            "norm_grad": float(self._columns["norm_grad"][i]),
+        }
+        for name, column in self._columns.items():
+            if name not in entry:
+                value = column[i]
+                entry[name] = None if np.isnan(value) else float(value)
+        return entry
 
     def get_log(self):
-        return self._logs
+        """Vista de compatibilidad: lista de diccionarios, uno por iteración."""
+        return [self._entry(j) for j in range(len(self))]
 
     def get_last(self):
-        return self._logs[-1] if self._logs else None
+        return self._entry(len(self) - 1) if len(self) else None
 
     def reset(self):
-        self._logs.clear()
+        self._start = self._size = 0
+        self._pending = False
+        self.policy.reset()
+        self._allocate()
 
     def print_summary(self):
         print(f"\n{'Iter':>4} | {'f(x)':>12} | {'‖∇f‖':>12} | {'Step α':>10}")
         print("-" * 46)
-        for log in self._logs:
-            alpha = f"{log['alpha']:.6f}" if log["alpha"] is not None else "-"
-            print(
-                f"{log['iter']:>4} | {log['f_x']:>12.6f} | {log['norm_grad']:>12.6f} | {alpha:>10}"
-            )
+        for k, f_x, norm_grad, alpha in zip(
+            self.iter, self.f_x, self.norm_grad, self.alpha
+        ):
+            alpha = f"{alpha:.6f}" if not np.isnan(alpha) else "-"
+            print(f"{k:>4} | {f_x:>12.6f} | {norm_grad:>12.6f} | {alpha:>10}")
@@ -0,0 +1,174 @@
+import numpy as np
+
+from core.evaluation import as_batch_function, as_batch_value_and_grad
+
+
+def random_starts(k: int, n: int, low=-5.0, high=5.0, seed=None) -> np.ndarray:
+    """Genera k puntos iniciales uniformes en [low, high]^n como arreglo (k, n)."""
+    rng = np.random.default_rng(seed)
+    return rng.uniform(low, high, size=(k, n))
+
+
+def multistart_gradient_descent(
+    f,
+    grad_f,
+    X0: np.ndarray,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    step_size: float = 0.01,
+    line_search=None,
+    value_and_grad=None,
+):
+    """
+    Descenso por gradiente desde k puntos iniciales a la vez.
+
+    El estado es un arreglo (k, n) y f/∇f se evalúan por lotes sobre todas las
+    filas activas en cada iteración. Cada fila que cumple ||∇f|| < tol se
+    retira del lote, así que el costo baja a medida que los arranques convergen.
+
+    Parámetros:
+    - f, grad_f, value_and_grad: objetivo en forma por lotes (p. ej.
+      CompiledObjective.batch_*); si no la soportan se evalúan fila por fila
+    - X0: puntos iniciales (k, n)
+    - tol: tolerancia para ||∇f(x)|| por fila
+    - max_iter: número máximo de iteraciones
+    - step_size: paso fijo (usado si no hay búsqueda lineal)
+    - line_search: None o "armijo" (retroceso con un paso por fila)
+
+    Retorna:
+    - result: diccionario con x (k, n), f (k,), iterations (k,), converged (k,)
+      y el mejor arranque en best_index, best_x y best_f
+    """
+    if line_search not in (None, "armijo"):
+        raise ValueError("line_search debe ser None o 'armijo'.")
+    evaluate = as_batch_value_and_grad(f, grad_f, value_and_grad)
+    function = as_batch_function(f)
+    run = _BatchRun(X0)
+    X = run.X
+    G = np.empty_like(X)
+
+    for k in range(1, max_iter + 1):
+        F, G = evaluate(X, G)
+        done = np.linalg.norm(G, axis=1) < tol
+        if done.any():
+            X, G, F = run.retire(done, F, k, X, G, np.asarray(F))
+            if not len(X):
+                break
+
+        if line_search == "armijo":
+            alpha = _batch_armijo(function, X, F, G)
+            X -= alpha[:, None] * G
+        else:
+            X -= step_size * G
+
+    return run.finish(X, function, max_iter)
+
+
+def multistart_adam(
+    f,
+    grad_f,
+    X0: np.ndarray,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    learning_rate: float = 0.01,
+    beta1: float = 0.9,
+    beta2: float = 0.999,
+    epsilon: float = 1e-8,
+    value_and_grad=None,
+):
+    """
+    Adam desde k puntos iniciales a la vez, con los momentos m y v también
+    como arreglos (k, n). Las filas convergidas se retiran del lote.
+
+    Parámetros: como en multistart_gradient_descent y adam.
+
+    Retorna:
+    - result: diccionario con x, f, iterations, converged, best_index, best_x, best_f
+    """
+    evaluate = as_batch_value_and_grad(f, grad_f, value_and_grad)
+    function = as_batch_function(f)
+    run = _BatchRun(X0)
+    X = run.X
+    G = np.empty_like(X)
+    m = np.zeros_like(X)
+    v = np.zeros_like(X)
+
+    for k in range(1, max_iter + 1):
+        F, G = evaluate(X, G)
+        done = np.linalg.norm(G, axis=1) < tol
+        if done.any():
+            X, G, m, v = run.retire(done, F, k, X, G, m, v)
+            if not len(X):
+                break
+
+        m *= beta1
+        m += (1 - beta1) * G
+        v *= beta2
+        v += (1 - beta2) * (G**2)
+
+        m_hat = m / (1 - beta1**k)
+        v_hat = v / (1 - beta2**k)
+
+        X -= learning_rate * m_hat / (np.sqrt(v_hat) + epsilon)
+
+    return run.finish(X, function, max_iter)
+
+
+class _BatchRun:
+    """Resultados por arranque y correspondencia entre filas activas y originales."""
+
+    def __init__(self, X0):
+        self.X = np.array(X0, dtype=float, ndmin=2)
+        k = len(self.X)
+        self.index = np.arange(k)
+        self.x_opt = np.empty_like(self.X)
+        self.f_opt = np.full(k, np.nan)
+        self.iterations = np.zeros(k, dtype=int)
+        self.converged = np.zeros(k, dtype=bool)
+
+    def retire(self, done, F, k, *arrays):
+        """Guarda las filas convergidas y devuelve los arreglos compactados."""
+        rows = self.index[done]
+        self.x_opt[rows] = arrays[0][done]
+        self.f_opt[rows] = np.asarray(F)[done]
+        self.iterations[rows] = k
+        self.converged[rows] = True
+
+        keep = ~done
+        self.index = self.index[keep]
+        return tuple(a[keep] for a in arrays)
+
+    def finish(self, X, function, max_iter):
+        if len(X):
+            self.x_opt[self.index] = X
+            self.f_opt[self.index] = function(X)
+            self.iterations[self.index] = max_iter
+
+        best = int(np.nanargmin(self.f_opt))
+        return {
+            "x": self.x_opt,
+            "f": self.f_opt,
+            "iterations": self.iterations,
+            "converged": self.converged,
+            "best_index": best,
+            "best_x": self.x_opt[best],
+            "best_f": self.f_opt[best],
+        }
+
+
+def _batch_armijo(function, X, F, G, alpha_init=1.0, rho=0.5, c=1e-4, max_iter=20):
+    """Retroceso de Armijo con dirección d = -∇f y un paso independiente por fila."""
+    alpha = np.full(len(X), alpha_init)
+    slope = -np.einsum("ij,ij->i", G, G)  # ∇f·d
+    pending = np.arange(len(X))
+
+    for _ in range(max_iter):
+        a = alpha[pending]
+        trial = X[pending] - a[:, None] * G[pending]
+        accepted = function(trial) <= F[pending] + c * a * slope[pending]
+        pending = pending[~accepted]
+        if not len(pending):
+            break
+        alpha[pending] *= rho
+
+    return alpha
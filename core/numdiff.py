@@ -0,0 +1,199 @@
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.evaluation import array_native, as_array_function, is_batch_native
+
+# Gradientes numéricos para objetivos sin forma simbólica. Todos los puntos
+# perturbados de un gradiente se construyen como un único lote (k, n): si f
+# admite lotes (batch_native) se evalúa en una sola llamada vectorizada, y si
+# no, las filas se reparten en un pool de hilos.
+
+METHODS = ("central", "forward", "complex")
+
+_EPS = np.finfo(float).eps
+# Paso relativo que equilibra truncamiento y redondeo en cada esquema
+_RELATIVE_STEP = {"central": _EPS ** (1 / 3), "forward": _EPS**0.5}
+# El paso complejo no sufre cancelación: puede ser tan pequeño como se quiera
+_COMPLEX_STEP = 1e-20
+
+
+@functools.cache
+def _executor(workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(workers, thread_name_prefix="numdiff")
+
+
+def step_sizes(x: np.ndarray, method: str = "central", step=None) -> np.ndarray:
+    """
+    Paso por coordenada para diferenciar en x.
+
+    Parámetros:
+    - x: punto (n,)
+    - method: "central", "forward" o "complex"
+    - step: paso absoluto (escalar o (n,)); por defecto se elige por
+      coordenada como paso_relativo * max(|x_i|, 1), con el signo de x_i
+
+    Retorna:
+    - h: pasos (n,). En los esquemas reales se ajustan para que x + h sea
+      exactamente representable y el cociente no arrastre error de redondeo.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de diferenciación desconocido: {method}")
+    if step is not None:
+        h = np.broadcast_to(np.asarray(step, dtype=float), x.shape).copy()
+    elif method == "complex":
+        return np.full(x.shape, _COMPLEX_STEP)
+    else:
+        sign = np.where(x >= 0, 1.0, -1.0)
+        h = _RELATIVE_STEP[method] * sign * np.maximum(np.abs(x), 1.0)
+    if method != "complex":
+        h = (x + h) - x
+    return h
+
+
+def perturbed_points(
+    x: np.ndarray, h: np.ndarray, method: str, with_value: bool = False
+) -> np.ndarray:
+    """
+    Lote de puntos perturbados: x + h_i e_i (2n puntos con x - h_i e_i en
+    "central", n en "forward") en orden de coordenadas. Se añade x al final
+    si method es "forward" (lo necesita el cociente) o si with_value=True.
+    En "complex" los puntos son x + i h_i e_i y f(x) es su parte real.
+    """
+    n = len(x)
+    rows = np.arange(n)
+    if method == "complex":
+        points = np.empty((n, n), dtype=complex)
+        points[:] = x
+        points[rows, rows] += 1j * h
+        return points
+
+    k = 2 * n if method == "central" else n
+    points = np.empty((k + (with_value or method == "forward"), n))
+    points[:] = x
+    points[rows, rows] += h
+    if method == "central":
+        points[n + rows, rows] -= h
+    return points
+
+
+def evaluate_points(f, points: np.ndarray, workers: int = None) -> np.ndarray:
+    """
+    Evalúa f en cada fila de points: en una sola llamada si f es
+    batch_native, y si no, repartiendo las filas en un pool de hilos
+    (workers=1 las recorre en este hilo).
+    """
+    if is_batch_native(f):
+        return np.asarray(f(points))
+
+    function = as_array_function(f)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(points) < 2:
+        return np.array([function(p) for p in points])
+    return np.array(list(_executor(workers).map(function, points)))
+
+
+def _differences(values, x, h, method):
+    """
+    (f(x), ∇f(x)) a partir de los valores en perturbed_points; f(x) es None
+    si el lote no lo incluye.
+    """
+    n = len(x)
+    if method == "complex":
+        if not np.iscomplexobj(values):
+            raise ValueError(
+                "La función descarta la parte imaginaria: el paso complejo no "
+                "es aplicable, usar method='central'."
+            )
+        return values[0].real, values.imag / h
+    if method == "forward":
+        return values[-1], (values[:n] - values[-1]) / h
+    f_x = values[-1] if len(values) > 2 * n else None
+    return f_x, (values[:n] - values[n : 2 * n]) / (2 * h)
+
+
+def _numerical_derivative(f, method, step, workers, with_value):
+    if method not in METHODS:
+        raise ValueError(f"Método de diferenciación desconocido: {method}")
+
+    def derivative(x, out=None):
+        x = np.asarray(x, dtype=float)
+        h = step_sizes(x, method, step)
+        points = perturbed_points(x, h, method, with_value)
+        f_x, grad = _differences(evaluate_points(f, points, workers), x, h, method)
+        if out is None:
+            return f_x, grad
+        out[:] = grad
+        return f_x, out
+
+    return derivative
+
+
+def numerical_value_and_grad(f, method="central", step=None, workers=None):
+    """
+    Construye value_and_grad(x, out=None) -> (f(x), ∇f(x)) por diferencias
+    finitas o paso complejo, listo para pasarse a los optimizadores.
+
+    Parámetros:
+    - f: función objetivo f(x), f(*x) o por lotes (batch_native)
+    - method: "central" (2n puntos, error O(h²)), "forward" (n puntos, O(h))
+      o "complex" (n puntos, exacto a precisión de máquina; requiere que f sea
+      analítica y acepte números complejos: sin abs, sign ni comparaciones)
+    - step: paso absoluto fijo (escalar o (n,)); por defecto ver step_sizes
+    - workers: hilos para evaluar los puntos si f no admite lotes; por
+      defecto uno por núcleo, 1 para evaluarlos en este hilo
+
+    Retorna:
+    - value_and_grad: función nativa sobre arreglos. f(x) sale del mismo lote
+      que las perturbaciones, sin una llamada adicional.
+    """
+    derivative = _numerical_derivative(f, method, step, workers, with_value=True)
+
+    @array_native
+    def value_and_grad(x, out=None):
+        f_x, grad = derivative(x, out)
+        return float(f_x), grad
+
+    return value_and_grad
+
+
+def numerical_gradient(f, method="central", step=None, workers=None):
+    """
+    Construye grad_f(x, out=None) -> ∇f(x) numérico, intercambiable con los
+    gradientes de core.gradients en cualquier optimizador de core.optimizers
+    o core.stochastic. Parámetros como en numerical_value_and_grad.
+    """
+    derivative = _numerical_derivative(f, method, step, workers, with_value=False)
+
+    @array_native
+    def gradient(x, out=None):
+        return derivative(x, out)[1]
+
+    return gradient
+
+
+def gradient_difference_hvp(grad_f):
+    """
+    Producto Hessiana-vector por diferencias del gradiente, sin formar la
+    Hessiana: H(x) v ≈ (∇f(x + h v) - ∇f(x)) / h, con h = √ε (1 + ‖x‖) / ‖v‖.
+
+    Parámetros:
+    - grad_f: gradiente nativo grad_f(x, out=None)
+
+    Retorna:
+    - hvp: hvp(x, v, grad_x=None) -> H(x) v. Si se pasa grad_x = ∇f(x) (ya
+      conocido por el optimizador) cuesta una sola evaluación del gradiente.
+    """
+
+    def hvp(x, v, grad_x=None):
+        norm_v = np.linalg.norm(v)
+        if norm_v == 0:
+            return np.zeros_like(x)
+        if grad_x is None:
+            grad_x = grad_f(x)
+        h = _RELATIVE_STEP["forward"] * (1 + np.linalg.norm(x)) / norm_v
+        return (grad_f(x + h * v) - grad_x) / h
+
+    return hvp
@@ -1,5 +1,16 @@
+import functools
+import inspect
+
 import numpy as np
 
+from core.evaluation import (
+    as_array_function,
+    as_array_gradient,
+    objective_evaluator,
+)
+from core.numdiff import gradient_difference_hvp
+from core.retention import History, readonly_view
+
 
 def gradient_descent(
     f,
@@ -11,6 +22,9 @@ def gradient_descent(
     line_search=None,
     callback=None,
     alpha=None,
+    value_and_grad=None,
+    retention=None,
+    record: str = "full",
 ):
     """
     Método de descenso por gradiente con paso fijo o búsqueda lineal.
@@ -22,26 +36,42 @@ def gradient_descent(
     - tol: tolerancia para ||∇f(x)||
     - max_iter: número máximo de iteraciones
     - step_size: paso inicial (usado si no hay búsqueda lineal)
-    - line_search: función line_search(f, grad_f, x, d), opcional
-    - callback: función que recibe info por iteración: callback(k, x, f_x, grad_x)
+    - line_search: función line_search(f, grad_f, x, d, f_x=, grad_x=, full_output=True)
+      -> (alpha, f_new, grad_new), opcional. Los valores en el punto aceptado se
+      reutilizan en la siguiente iteración.
+    - callback: función que recibe info por iteración: callback(k, x, f_x, grad_x);
+      x y grad_x son vistas de solo lectura (copiarlas si se quieren guardar).
+      Si devuelve True la optimización se detiene en esa iteración.
+    - value_and_grad: función fusionada (x desempaquetado o nativa), opcional
+    - retention: política de retención del historial (core.retention), opcional
+    - record: qué guarda el historial: "full", "scalars" o "none"
 
     Retorna:
     - x_opt: punto final
     - history: lista con los registros por iteración [(k, x, f(x), ||grad||)]
     """
-    x = x0.copy()
-    history = []
+    x = np.array(x0, dtype=float)
+    history = History(retention, record)
+    f, grad_f = as_array_function(f), as_array_gradient(grad_f)
+    evaluate = objective_evaluator(f, grad_f, value_and_grad)
+    grad = np.empty_like(x)
+    f_new = grad_new = None
 
     for k in range(1, max_iter + 1):
-        grad = grad_f(*x)
-        grad = np.array(grad, dtype=float)  # por si viene como lista sympy
+        if f_new is None:
+            f_x, grad = evaluate(x, grad)
+        else:
+            # valores ya calculados por la búsqueda lineal en el punto aceptado
+            f_x = f_new
+            grad = grad_new if grad_new is not None else grad_f(x, grad)
         norm_grad = np.linalg.norm(grad)
 
-        f_x = f(*x)
-        history.append((k, x.copy(), f_x, norm_grad))
+        history.add(k, x, f_x, norm_grad)
 
-        if callback:
-            callback(k, x.copy(), f_x, grad.copy(), norm_grad, alpha)
+        if callback and callback(
+            k, readonly_view(x), f_x, readonly_view(grad), norm_grad, alpha
+        ):
+            break  # detención solicitada por el callback
 
         if norm_grad < tol:
             break
@@ -49,7 +79,9 @@ def gradient_descent(
         d = -grad  # dirección de descenso
 
         if line_search:
-            alpha = line_search(f, grad_f, x, d)
+            alpha, f_new, grad_new = line_search(
+                f, grad_f, x, d, f_x=f_x, grad_x=grad, full_output=True
+            )
         else:
             alpha = step_size
 
@@ -66,64 +98,470 @@ def bfgs(
     max_iter: int = 100,
     line_search=None,
     callback=None,
+    value_and_grad=None,
+    curvature: str = "skip",
+    retention=None,
+    record: str = "full",
 ):
     """
     Método BFGS (quasi-Newton) con opción de búsqueda lineal.
 
+    La aproximación H de la Hessiana inversa se actualiza en el lugar con una
+    corrección simétrica de rango dos, en O(n²) y sin matrices n×n temporales.
+    Antes de la primera actualización H se escala con γ = sᵀy / yᵀy.
+
     Parámetros:
     - f: función objetivo
     - grad_f: gradiente
     - x0: punto inicial
     - tol: tolerancia sobre ||∇f||
     - max_iter: máximo de iteraciones
-    - line_search: función line_search(f, grad_f, x, d), opcional
-    - callback: función de monitoreo por iteración
+    - line_search: función line_search(f, grad_f, x, d, f_x=, grad_x=, full_output=True)
+      -> (alpha, f_new, grad_new), opcional. Los valores en el punto aceptado se
+      reutilizan en la siguiente iteración.
+    - callback: función de monitoreo callback(k, x, f_x, grad, norm_grad, alpha);
+      si acepta skipped_updates (o **info) recibe además las actualizaciones
+      de H omitidas hasta ahora. Si devuelve True la optimización se detiene
+    - value_and_grad: función fusionada (x desempaquetado o nativa), opcional
+    - curvature: qué hacer si sᵀy no es suficientemente positivo: "skip" omite
+      la actualización y "damp" aplica el amortiguamiento de Powell (sobre s)
+    - retention: política de retención del historial (core.retention), opcional
+    - record: qué guarda el historial: "full", "scalars" o "none"
 
     Retorna:
     - x_opt: punto óptimo
     - history: lista con registros por iteración
     """
-    x = x0.copy()
+    if curvature not in ("skip", "damp"):
+        raise ValueError("curvature debe ser 'skip' o 'damp'.")
+    callback = _with_info(callback)
+
+    x = np.array(x0, dtype=float)
     n = len(x)
     H = np.eye(n)  # Aproximación inicial de la Hessiana inversa
-    history = []
+    Hy = np.empty(n)
+    d = np.empty(n)
+    work = np.empty((min(n, _UPDATE_BLOCK_ROWS), n))  # bloque de filas para H
+    scaled = False
+    skipped = 0
+    history = History(retention, record)
     alpha = None
+    f, grad_f = as_array_function(f), as_array_gradient(grad_f)
+    evaluate = objective_evaluator(f, grad_f, value_and_grad)
+    f_x, grad = evaluate(x, np.empty_like(x))
+    spare = np.empty_like(x)
 
     for k in range(1, max_iter + 1):
-        grad = np.array(grad_f(*x), dtype=float)
         norm_grad = np.linalg.norm(grad)
-        f_x = f(*x)
 
-        history.append((k, x.copy(), f_x, norm_grad))
-        if callback:
-            callback(k, x.copy(), f_x, grad.copy(), norm_grad, alpha)
+        history.add(k, x, f_x, norm_grad)
+        if callback and callback(
+            k,
+            readonly_view(x),
+            f_x,
+            readonly_view(grad),
+            norm_grad,
+            alpha,
+            skipped_updates=skipped,
+        ):
+            break  # detención solicitada por el callback
 
         if norm_grad < tol:
             break
 
         # Dirección de descenso: -H ∇f
-        d = -H @ grad
+        np.dot(H, grad, out=d)
+        np.negative(d, out=d)
 
         # Paso
-        alpha = line_search(f, grad_f, x, d) if line_search else 1.0
+        f_new = grad_new = None
+        if line_search:
+            alpha, f_new, grad_new = line_search(
+                f, grad_f, x, d, f_x=f_x, grad_x=grad, full_output=True
+            )
+        else:
+            alpha = 1.0
         x_new = x + alpha * d
 
+        # f y ∇f en x_new: se reutiliza lo que ya evaluó la búsqueda lineal
+        if f_new is None:
+            f_new, grad_new = evaluate(x_new, spare)
+        elif grad_new is None:
+            grad_new = grad_f(x_new, spare)
+
         # Diferencias
         s = x_new - x
-        y = np.array(grad_f(*x_new), dtype=float) - grad
+        y = grad_new - grad
+        sy = s @ y
+
+        if not scaled and sy > 0:
+            # Escalado inicial H0 = γ I con el primer paso
+            H *= sy / (y @ y)
+            scaled = True
+
+        np.dot(H, y, out=Hy)
+        yHy = y @ Hy
+
+        if curvature == "damp" and sy < 0.2 * yHy:
+            # Amortiguamiento de Powell en forma inversa: s ← θ s + (1 - θ) H y
+            theta = 0.8 * yHy / (yHy - sy)
+            s = theta * s + (1 - theta) * Hy
+            sy = s @ y
+
+        if sy > 1e-10 * np.linalg.norm(s) * np.linalg.norm(y):
+            _bfgs_inverse_update(H, s, Hy, sy, yHy, work)
+            scaled = True
+        else:
+            skipped += 1  # curvatura no positiva: H se mantiene
+
+        spare = grad  # el buffer del gradiente anterior queda libre
+        x, f_x, grad = x_new, f_new, grad_new
+
+    return x, history
+
+
+def _with_info(callback):
+    """
+    Adapta el callback a los datos extra del método (skipped_updates, ...):
+    solo se le pasan los que acepta por nombre, todos si declara **info, y
+    ninguno a un callback clásico callback(k, x, f_x, grad, norm_grad, alpha).
+    """
+    if callback is None:
+        return None
+    try:
+        parameters = inspect.signature(callback).parameters.values()
+    except (TypeError, ValueError):
+        return callback  # sin firma inspeccionable: se asume que acepta **info
+    if any(p.kind is p.VAR_KEYWORD for p in parameters):
+        return callback
+    accepted = {
+        p.name
+        for p in parameters
+        if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)
+    }
+
+    def plain_callback(*args, **info):
+        return callback(*args, **{k: v for k, v in info.items() if k in accepted})
+
+    return plain_callback
+
+
+_UPDATE_BLOCK_ROWS = 256
+
+
+def _bfgs_inverse_update(H, s, Hy, sy, yHy, work):
+    """
+    Aplica en el lugar la fórmula BFGS de la Hessiana inversa
+
+        H ← (I - ρ s yᵀ) H (I - ρ y sᵀ) + ρ s sᵀ,   ρ = 1 / sᵀy
+
+    escrita como la corrección simétrica H ← H + s wᵀ + w sᵀ con
+    w = ½ (ρ + ρ² yᵀHy) s - ρ H y. Se recorre H por bloques de filas usando
+    el buffer work, así que no se crean matrices n×n temporales.
+    """
+    rho = 1.0 / sy
+    w = (0.5 * (rho + rho * rho * yHy)) * s - rho * Hy
+    n = len(s)
+    block = work.shape[0]
+
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        rows = H[start:stop]
+        buf = work[: stop - start]
+        np.outer(s[start:stop], w, out=buf)
+        rows += buf
+        np.outer(w[start:stop], s, out=buf)
+        rows += buf
+
+
+def lbfgs(
+    f,
+    grad_f,
+    x0: np.ndarray,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    m: int = 10,
+    line_search=None,
+    callback=None,
+    value_and_grad=None,
+    retention=None,
+    record: str = "full",
+):
+    """
+    Método L-BFGS (BFGS de memoria limitada) con opción de búsqueda lineal.
+
+    En lugar de la matriz densa H guarda los últimos m pares (s, y) en un
+    buffer circular y calcula -H ∇f con la recursión de dos ciclos, con
+    costo O(m n) por iteración en tiempo y memoria.
+
+    Parámetros:
+    - f: función objetivo
+    - grad_f: gradiente
+    - x0: punto inicial
+    - tol: tolerancia sobre ||∇f||
+    - max_iter: máximo de iteraciones
+    - m: número de pares (s, y) guardados
+    - line_search: función line_search(f, grad_f, x, d, f_x=, grad_x=, full_output=True)
+      -> (alpha, f_new, grad_new), opcional
+    - callback: función de monitoreo por iteración (True para detener)
+    - value_and_grad: función fusionada (x desempaquetado o nativa), opcional
+    - retention: política de retención del historial (core.retention), opcional
+    - record: qué guarda el historial: "full", "scalars" o "none"
+
+    Retorna:
+    - x_opt: punto óptimo
+    - history: lista con registros por iteración
+    """
+    if m < 1:
+        raise ValueError("m debe ser al menos 1.")
+    x = np.array(x0, dtype=float)
+    n = len(x)
+    S = np.empty((m, n))
+    Y = np.empty((m, n))
+    rho = np.empty(m)
+    stored = 0  # pares guardados en total; el más reciente está en (stored - 1) % m
+    s = np.empty(n)  # par candidato, se copia al buffer solo si se acepta
+    y = np.empty(n)
+    history = History(retention, record)
+    alpha = None
+    f, grad_f = as_array_function(f), as_array_gradient(grad_f)
+    evaluate = objective_evaluator(f, grad_f, value_and_grad)
+    f_x, grad = evaluate(x, np.empty_like(x))
+    spare = np.empty_like(x)
+
+    for k in range(1, max_iter + 1):
+        norm_grad = np.linalg.norm(grad)
+
+        history.add(k, x, f_x, norm_grad)
+        if callback and callback(
+            k, readonly_view(x), f_x, readonly_view(grad), norm_grad, alpha
+        ):
+            break  # detención solicitada por el callback
+
+        if norm_grad < tol:
+            break
+
+        d = -_two_loop_recursion(grad, S, Y, rho, stored)
+
+        f_new = grad_new = None
+        if line_search:
+            alpha, f_new, grad_new = line_search(
+                f, grad_f, x, d, f_x=f_x, grad_x=grad, full_output=True
+            )
+        else:
+            alpha = 1.0
+        x_new = x + alpha * d
+
+        if f_new is None:
+            f_new, grad_new = evaluate(x_new, spare)
+        elif grad_new is None:
+            grad_new = grad_f(x_new, spare)
+
+        # Guardar (s, y) en el buffer circular si cumple la condición de
+        # curvatura; si se rechaza, el par más antiguo queda intacto
+        np.subtract(x_new, x, out=s)
+        np.subtract(grad_new, grad, out=y)
+        sy = s @ y
+        if sy > 1e-10 * np.linalg.norm(s) * np.linalg.norm(y):
+            head = stored % m
+            S[head] = s
+            Y[head] = y
+            rho[head] = 1.0 / sy
+            stored += 1
+
+        spare = grad
+        x, f_x, grad = x_new, f_new, grad_new
+
+    return x, history
+
+
+def _two_loop_recursion(grad, S, Y, rho, stored):
+    """Calcula H ∇f con los pares (s, y) guardados, del más reciente al más antiguo."""
+    m = len(rho)
+    order = [(stored - 1 - i) % m for i in range(min(stored, m))]
+    a = np.empty(m)
+    q = grad.copy()
+
+    for i in order:
+        a[i] = rho[i] * (S[i] @ q)
+        q -= a[i] * Y[i]
+
+    if order:
+        # Escalado de H0 = γ I con el par más reciente
+        newest = order[0]
+        q *= (S[newest] @ Y[newest]) / (Y[newest] @ Y[newest])
+
+    for i in reversed(order):
+        b = rho[i] * (Y[i] @ q)
+        q += (a[i] - b) * S[i]
+
+    return q
+
+
+def newton_cg(
+    f,
+    grad_f,
+    x0: np.ndarray,
+    hvp=None,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    max_cg_iter: int = None,
+    hessian=None,
+    forcing: str = "superlinear",
+    line_search=None,
+    callback=None,
+    value_and_grad=None,
+    retention=None,
+    record: str = "full",
+):
+    """
+    Método de Newton-CG (Newton truncado) con opción de búsqueda lineal.
+
+    La dirección resuelve de forma inexacta H d = -∇f con gradiente conjugado,
+    usando solo productos Hessiana-vector: la Hessiana nunca se forma y la
+    memoria es O(n). El CG se detiene cuando ||r|| ≤ η_k ||∇f|| (término de
+    forzado) o al encontrar curvatura no positiva.
+
+    Parámetros:
+    - f: función objetivo
+    - grad_f: gradiente
+    - x0: punto inicial
+    - hvp: producto Hessiana-vector hvp(x, v) -> H(x) v, opcional (p. ej.
+      CompiledObjective.array_hvp o Problem.hvp). Sin él se usan diferencias
+      del gradiente (core.numdiff.gradient_difference_hvp).
+    - tol: tolerancia sobre ||∇f||
+    - max_iter: máximo de iteraciones externas
+    - max_cg_iter: máximo de iteraciones de CG por paso (por defecto n)
+    - hessian: hessian(x) -> matriz con .matvec (p. ej. core.sparse.CSRMatrix
+      de Problem.sparse_hessian o CompiledObjective.sparse_hessian), opcional.
+      Se forma una vez por iteración externa y el CG usa sus productos en
+      lugar de hvp: conviene cuando H es dispersa y hay muchos pasos de CG.
+    - forcing: η_k = min(0.5, ||∇f||^p) con p = ½ ("superlinear") o
+      p = 1 ("quadratic"); un número fija η_k constante (convergencia lineal)
+    - line_search: función line_search(f, grad_f, x, d, f_x=, grad_x=, full_output=True)
+      -> (alpha, f_new, grad_new), opcional
+    - callback: función de monitoreo callback(k, x, f_x, grad, norm_grad, alpha);
+      si acepta cg_iterations (o **info) recibe además las iteraciones de CG
+      del paso anterior. Si devuelve True la optimización se detiene
+    - value_and_grad: función fusionada (x desempaquetado o nativa), opcional
+    - retention: política de retención del historial (core.retention), opcional
+    - record: qué guarda el historial: "full", "scalars" o "none"
+
+    Retorna:
+    - x_opt: punto óptimo
+    - history: lista con registros por iteración
+    """
+    if forcing not in ("superlinear", "quadratic") and not isinstance(
+        forcing, (int, float)
+    ):
+        raise ValueError("forcing debe ser 'superlinear', 'quadratic' o un número.")
+    callback = _with_info(callback)
+
+    x = np.array(x0, dtype=float)
+    n = len(x)
+    max_cg_iter = max_cg_iter or n
+    history = History(retention, record)
+    alpha = None
+    cg_iterations = 0
+    f, grad_f = as_array_function(f), as_array_gradient(grad_f)
+    evaluate = objective_evaluator(f, grad_f, value_and_grad)
+    if hvp is None:
+        hvp = gradient_difference_hvp(grad_f)
+        uses_grad = True  # reutiliza ∇f(x): un gradiente por producto
+    else:
+        uses_grad = False
+    f_x, grad = evaluate(x, np.empty_like(x))
+    spare = np.empty_like(x)
+
+    for k in range(1, max_iter + 1):
+        norm_grad = np.linalg.norm(grad)
+
+        history.add(k, x, f_x, norm_grad)
+        if callback and callback(
+            k,
+            readonly_view(x),
+            f_x,
+            readonly_view(grad),
+            norm_grad,
+            alpha,
+            cg_iterations=cg_iterations,
+        ):
+            break  # detención solicitada por el callback
+
+        if norm_grad < tol:
+            break
+
+        if forcing == "superlinear":
+            eta = min(0.5, np.sqrt(norm_grad))
+        elif forcing == "quadratic":
+            eta = min(0.5, norm_grad)
+        else:
+            eta = forcing
+
+        if hessian is not None:
+            hessp = hessian(x).matvec  # H formada una vez por iteración
+        elif uses_grad:
+            hessp = functools.partial(hvp, x, grad_x=grad)
+        else:
+            hessp = functools.partial(hvp, x)
+
+        d, cg_iterations = _truncated_cg(hessp, grad, eta * norm_grad, max_cg_iter)
+
+        f_new = grad_new = None
+        if line_search:
+            alpha, f_new, grad_new = line_search(
+                f, grad_f, x, d, f_x=f_x, grad_x=grad, full_output=True
+            )
+        else:
+            alpha = 1.0
+        x_new = x + alpha * d
 
-        # Actualización de H con fórmula BFGS
-        rho = 1.0 / (y @ s)
-        I = np.eye(n)
-        H = (I - rho * np.outer(s, y)) @ H @ (
-            I - rho * np.outer(y, s)
-        ) + rho * np.outer(s, s)
+        if f_new is None:
+            f_new, grad_new = evaluate(x_new, spare)
+        elif grad_new is None:
+            grad_new = grad_f(x_new, spare)
 
-        x = x_new
+        spare = grad
+        x, f_x, grad = x_new, f_new, grad_new
 
     return x, history
 
 
+def _truncated_cg(hessp, grad, tol, max_iter):
+    """
+    Resuelve H z = -∇f por gradiente conjugado hasta ||r|| ≤ tol.
+
+    Si encuentra una dirección de curvatura no positiva devuelve el iterado
+    actual (o -∇f si ocurre en la primera iteración), que sigue siendo una
+    dirección de descenso.
+
+    Retorna:
+    - z: dirección de búsqueda
+    - iteraciones de CG realizadas
+    """
+    z = np.zeros_like(grad)
+    r = grad.copy()  # residuo H z + ∇f
+    p = -r
+    rr = r @ r
+
+    for j in range(max_iter):
+        Hp = hessp(p)
+        pHp = p @ Hp
+        if pHp <= 0:
+            return (-grad if j == 0 else z), j + 1
+        step = rr / pHp
+        z += step * p
+        r += step * Hp
+        rr_new = r @ r
+        if np.sqrt(rr_new) <= tol:
+            return z, j + 1
+        p *= rr_new / rr
+        p -= r
+        rr = rr_new
+
+    return z, max_iter
+
+
 def adam(
     f,
     grad_f,
@@ -135,6 +573,9 @@ def adam(
     beta2: float = 0.999,
     epsilon: float = 1e-8,
     callback=None,
+    value_and_grad=None,
+    retention=None,
+    record: str = "full",
 ):
     """
     Adam optimizer para funciones multivariables.
@@ -149,32 +590,40 @@ def adam(
     - beta1: decaimiento de primer momento
     - beta2: decaimiento de segundo momento
     - epsilon: valor pequeño para estabilidad numérica
-    - callback: función para logging de iteraciones
+    - callback: función para logging de iteraciones (True para detener)
+    - value_and_grad: función fusionada (x desempaquetado o nativa), opcional
+    - retention: política de retención del historial (core.retention), opcional
+    - record: qué guarda el historial: "full", "scalars" o "none"
 
     Retorna:
     - x_opt: punto encontrado
     - history: lista de tuplas (iter, x, f(x), ||grad||, α)
     """
-    x = x0.copy()
+    x = np.array(x0, dtype=float)
     m = np.zeros_like(x)
     v = np.zeros_like(x)
-    history = []
+    history = History(retention, record)
+    evaluate = objective_evaluator(f, grad_f, value_and_grad)
+    grad = np.empty_like(x)
 
     for k in range(1, max_iter + 1):
-        grad = np.array(grad_f(*x), dtype=float)
-        f_x = f(*x)
+        f_x, grad = evaluate(x, grad)
         norm_grad = np.linalg.norm(grad)
 
-        history.append((k, x.copy(), f_x, norm_grad, learning_rate))
+        history.add(k, x, f_x, norm_grad, learning_rate)
 
-        if callback:
-            callback(k, x.copy(), f_x, grad.copy(), norm_grad, learning_rate)
+        if callback and callback(
+            k, readonly_view(x), f_x, readonly_view(grad), norm_grad, learning_rate
+        ):
+            break  # detención solicitada por el callback
 
         if norm_grad < tol:
             break
 
-        m = beta1 * m + (1 - beta1) * grad
-        v = beta2 * v + (1 - beta2) * (grad**2)
+        m *= beta1
+        m += (1 - beta1) * grad
+        v *= beta2
+        v += (1 - beta2) * (grad**2)
 
         m_hat = m / (1 - beta1**k)
         v_hat = v / (1 - beta2**k)
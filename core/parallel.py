@@ -0,0 +1,87 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core.runner import run_job
+
+
+def run_parallel(jobs, max_workers=None):
+    """
+    Ejecuta trabajos de optimización en un pool de procesos y entrega los
+    resultados a medida que terminan (no en el orden de entrada).
+
+    Cada proceso mantiene su propia caché de core.gradients, así que cada
+    expresión distinta se compila una sola vez por proceso.
+
+    Parámetros:
+    - jobs: iterable de trabajos con el formato de core.runner.run_job
+    - max_workers: número de procesos (por defecto, os.cpu_count())
+
+    Retorna:
+    - generador de resultados de run_job; cada uno incluye "index" (posición
+      del trabajo en jobs), "worker" (pid) y, si falló, "error"
+    """
+    jobs = list(jobs)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_run_job_safely, job, i): i for i, job in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_jobs(jobs, max_workers=1):
+    """
+    Como run_parallel, pero con max_workers=1 ejecuta los trabajos en este
+    mismo proceso y en orden (sin el costo de arrancar el pool).
+    """
+    if max_workers == 1:
+        return (_run_job_safely(job, i) for i, job in enumerate(jobs))
+    return run_parallel(jobs, max_workers)
+
+
+def _run_job_safely(job, index):
+    start_time = time.perf_counter()
+    try:
+        result = run_job(job)
+    except Exception as e:
+        result = {
+            "id": job.get("id"),
+            "method": job.get("method"),
+            "error": f"{type(e).__name__}: {str(e)}",
+            "time": time.perf_counter() - start_time,
+        }
+    result["index"] = index
+    result["worker"] = os.getpid()
+    return result
+
+
+def sweep(base_job: dict, x0_list=None, **options):
+    """
+    Genera trabajos con el producto cartesiano de hiperparámetros y puntos
+    iniciales a partir de un trabajo base.
+
+    Ejemplo:
+        sweep(job, learning_rate=[0.1, 0.01], tol=[1e-6, 1e-8], x0_list=starts)
+
+    Parámetros:
+    - base_job: trabajo con el objetivo y el método
+    - x0_list: lista de puntos iniciales (por defecto, el x0 del trabajo base)
+    - **options: listas de valores por hiperparámetro (van a "options")
+
+    Retorna:
+    - lista de trabajos
+    """
+    x0_list = x0_list if x0_list is not None else [base_job["x0"]]
+    names = list(options)
+    jobs = []
+    for x0 in x0_list:
+        for values in itertools.product(*(options[name] for name in names)):
+            job = dict(base_job)
+            job["x0"] = list(x0)
+            job["options"] = {**base_job.get("options", {}), **dict(zip(names, values))}
+            jobs.append(job)
+    return jobs
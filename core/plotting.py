@@ -1,22 +1,209 @@
-import matplotlib.pyplot as plt
+import heapq
+import threading
+from collections import OrderedDict
+
 import numpy as np
-from mpl_toolkits.mplot3d import Axes3D
-from sympy import lambdify, symbols
 
+from core.gradients import _cache_key, compile_objective
 
-def show_3d_plot(root, func_str, variables, points=None):
-    if len(variables) != 2:
+# matplotlib.pyplot y mpl_toolkits.mplot3d se importan al abrir cada ventana,
+# no al importar el módulo (la GUI solo usa minmax_downsample al arrancar).
+
+# Caché LRU de mallas evaluadas, compartida por la vista 3D y la de contornos
+_GRID_CACHE_MAXSIZE = 16
+_grid_cache = OrderedDict()
+_grid_cache_lock = threading.Lock()
+
+_CHUNK_POINTS = 1 << 16  # puntos por bloque al evaluar la malla
+
+
+def surface_grid(
+    func_str, variables, x_range, y_range, resolution=100, window=None, fine=100
+):
+    """
+    Malla (X, Y, Z) de una expresión de 2 variables, guardada en caché por
+    expresión, variables, rango, resolución y ventana de refinamiento.
+
+    Parámetros:
+    - x_range, y_range: intervalos (min, max) de la malla
+    - resolution: puntos por eje en todo el rango
+    - window: ((x0, x1), (y0, y1)) donde se agregan fine puntos más por eje
+      (ver refinement_window), o None para una malla uniforme
+
+    Retorna:
+    - X, Y, Z de solo lectura; la malla es rectilínea (más densa en la ventana)
+    """
+    key = (
+        _cache_key(func_str, variables),
+        tuple(map(float, x_range)),
+        tuple(map(float, y_range)),
+        resolution,
+        None if window is None else tuple(tuple(map(float, w)) for w in window),
+        fine if window is not None else None,
+    )
+    with _grid_cache_lock:
+        grid = _grid_cache.get(key)
+        if grid is not None:
+            _grid_cache.move_to_end(key)
+            return grid
+
+    x = np.linspace(*x_range, resolution)
+    y = np.linspace(*y_range, resolution)
+    if window is not None:
+        x = np.union1d(x, np.linspace(*window[0], fine))
+        y = np.union1d(y, np.linspace(*window[1], fine))
+    Z = _evaluate_chunked(compile_objective(func_str, variables).surface, x, y)
+    grid = (*np.meshgrid(x, y), Z)
+    for array in grid:
+        array.flags.writeable = False
+
+    with _grid_cache_lock:
+        _grid_cache[key] = grid
+        while len(_grid_cache) > _GRID_CACHE_MAXSIZE:
+            _grid_cache.popitem(last=False)
+    return grid
+
+
+def _evaluate_chunked(surface, x, y):
+    """Evalúa surface por bloques de filas para acotar los temporales."""
+    Z = np.empty((len(y), len(x)))
+    rows = max(1, _CHUNK_POINTS // len(x))
+    for i in range(0, len(y), rows):
+        X, Y = np.meshgrid(x, y[i : i + rows])
+        Z[i : i + rows] = surface(X, Y)
+    return Z
+
+
+def clear_surface_cache():
+    with _grid_cache_lock:
+        _grid_cache.clear()
+
+
+def refinement_window(points, x_range, y_range, pad=0.2, min_size=0.1):
+    """
+    Rectángulo alrededor de los puntos de interés (trayectoria, óptimo) donde
+    conviene refinar la malla, recortado al rango de la gráfica.
+
+    Parámetros:
+    - points: arreglo (m, 2) de puntos o None
+    - pad: margen relativo al tamaño del rectángulo
+    - min_size: tamaño mínimo relativo al rango (para un solo punto)
+
+    Retorna:
+    - ((x0, x1), (y0, y1)) o None si no hay puntos dentro del rango
+    """
+    if points is None:
+        return None
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    points = points[np.isfinite(points).all(axis=1)]
+    window = []
+    for values, (low, high) in zip(points.T, (x_range, y_range)):
+        values = values[(values >= low) & (values <= high)]
+        if not len(values):
+            return None
+        size = max(values.max() - values.min(), min_size * (high - low))
+        center = (values.max() + values.min()) / 2
+        half = size * (0.5 + pad)
+        window.append((max(low, center - half), min(high, center + half)))
+    return tuple(window)
+
+
+def _refine_later(widget, canvas, redraw, focus):
+    """Dibuja primero la malla gruesa y refina cuando Tk queda libre."""
+    if focus is None:
+        return
+
+    def refine():
+        try:
+            redraw(focus)
+        except Exception:
+            return
+        canvas.draw_idle()
+
+    widget.after_idle(refine)
+
+
+TRAJECTORY_BUDGET = 500  # puntos máximos de la trayectoria dibujada
+
+
+def simplify_path(points, budget=TRAJECTORY_BUDGET):
+    """
+    Simplifica una trayectoria conservando sus puntos de giro (Ramer-Douglas-
+    Peucker con presupuesto): parte del primer y último punto y agrega cada
+    vez el punto más alejado de su segmento, hasta tener budget puntos o
+    hasta que los tramos restantes sean rectos.
+
+    Parámetros:
+    - points: arreglo (m, d) de puntos en orden
+    - budget: número máximo de puntos del resultado
+
+    Retorna:
+    - índices (ordenados) de los puntos conservados
+    """
+    points = np.asarray(points, dtype=float)
+    m = len(points)
+    if m <= budget:
+        return np.arange(m)
+
+    keep = [0, m - 1]
+    heap = []
+    _push_split(heap, points, 0, m - 1)
+    while heap and len(keep) < budget:
+        _, first, split, last = heapq.heappop(heap)
+        keep.append(split)
+        _push_split(heap, points, first, split)
+        _push_split(heap, points, split, last)
+    return np.sort(keep)
+
+
+def _push_split(heap, points, first, last):
+    """Agrega al heap el punto de (first, last) más alejado de su cuerda."""
+    if last - first < 2:
         return
+    inner = points[first + 1 : last] - points[first]
+    chord = points[last] - points[first]
+    length = np.linalg.norm(chord)
+    if length > 0:
+        chord = chord / length
+        inner = inner - np.outer(inner @ chord, chord)
+    distance = np.einsum("ij,ij->i", inner, inner)
+    distance[~np.isfinite(distance)] = 0.0
+    i = int(distance.argmax())
+    if not distance[i] > (1e-12 * length) ** 2:
+        return  # tramo recto: los puntos intermedios no aportan nada
+    heapq.heappush(heap, (-distance[i], first, first + 1 + i, last))
+
+
+def _trajectory_segments(path, x_range, y_range):
+    """Segmentos consecutivos de path con ambos extremos dentro del rango."""
+    inside = (
+        (path[:, 0] >= x_range[0])
+        & (path[:, 0] <= x_range[1])
+        & (path[:, 1] >= y_range[0])
+        & (path[:, 1] <= y_range[1])
+    )
+    valid = inside[:-1] & inside[1:]
+    return np.stack([path[:-1], path[1:]], axis=1)[valid], np.flatnonzero(valid)
 
-    x_sym, y_sym = symbols(variables)
-    f_lambdified = lambdify((x_sym, y_sym), func_str, "numpy")
 
-    x = np.linspace(-5, 5, 100)
-    y = np.linspace(-5, 5, 100)
-    X, Y = np.meshgrid(x, y)
+def show_3d_plot(root, func_str, variables, trajectory=None, point=None):
+    """
+    Superficie de f en [-5, 5]² en una ventana aparte. trajectory es el
+    arreglo (m, 2) de puntos x por iteración (p. ej. OptimizerLogger.x); se
+    simplifica a TRAJECTORY_BUDGET puntos y se dibuja como una sola colección
+    de líneas con el inicio y el final marcados. Sin trayectoria, la malla se
+    refina alrededor de point (el óptimo), como en contour_plot.
+    """
+    if len(variables) != 2:
+        return
 
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+    x_range = y_range = (-5, 5)
     try:
-        Z = f_lambdified(X, Y)
+        f_lambdified = compile_objective(func_str, variables).surface
+        X, Y, Z = surface_grid(func_str, variables, x_range, y_range, resolution=100)
     except Exception:
         from tkinter import messagebox
 
@@ -25,33 +212,26 @@ def show_3d_plot(root, func_str, variables, points=None):
 
     fig = plt.figure(figsize=(6, 4))
     ax = fig.add_subplot(111, projection="3d")
-    ax.plot_surface(X, Y, Z, cmap="viridis", edgecolor="none", alpha=0.9)
+    surface = ax.plot_surface(X, Y, Z, cmap="viridis", edgecolor="none", alpha=0.9)
     ax.set_title("3D Surface of f(x, y)")
     ax.set_xlabel(variables[0])
     ax.set_ylabel(variables[1])
     ax.set_zlabel("f(x, y)")
-    
-    if points is not None:
-        points = np.array(points)  # Asegurar que es un array numpy
-
-        percent_to_show = 0.6  # 60% de los puntos más recientes
-        
-        total_points = len(points[0])
-        num_points_to_show = int(total_points * percent_to_show)
-        
-        x_points = points[0][-num_points_to_show:]
-        y_points = points[1][-num_points_to_show:]
-        z_points = f_lambdified(x_points, y_points)
-        
-        valid_mask = (x_points >= -5) & (x_points <= 5) & (y_points >= -5) & (y_points <= 5)
-        x_points = x_points[valid_mask]
-        y_points = y_points[valid_mask]
-        z_points = z_points[valid_mask]
-        
-        # Graficar todos los puntos
-        ax.scatter(x_points, y_points, z_points, color='red', s=50, label='Points by Iteration')
-        ax.legend(loc='lower center', bbox_to_anchor=(0.5, -0.1), ncol=1, borderaxespad=0.5)
-    
+
+    if trajectory is not None and len(trajectory):
+        path = np.asarray(trajectory, dtype=float)[:, :2]
+        path = path[simplify_path(path)]
+        path = np.column_stack([path, f_lambdified(path[:, 0], path[:, 1])])
+        segments, index = _trajectory_segments(path, x_range, y_range)
+        lines = Line3DCollection(segments, cmap="autumn", linewidths=2)
+        lines.set_array(index / max(len(path) - 1, 1))
+        ax.add_collection(lines)
+        ax.scatter(*path[0], color="lime", s=40, label="Start", depthshade=False)
+        ax.scatter(*path[-1], color="red", s=40, label="End", depthshade=False)
+        ax.legend(
+            loc="lower center", bbox_to_anchor=(0.5, -0.1), ncol=2, borderaxespad=0.5
+        )
+
     # Mostrar en ventana aparte
     import tkinter as tk
 
@@ -63,19 +243,45 @@ def show_3d_plot(root, func_str, variables, points=None):
     canvas.draw()
     canvas.get_tk_widget().pack(fill="both", expand=True)
 
-def contour_plot(root, func_str, variables, point=None):
+    def redraw(focus):
+        nonlocal surface
+        X, Y, Z = surface_grid(
+            func_str, variables, x_range, y_range, resolution=100, window=focus, fine=50
+        )
+        surface.remove()
+        surface = ax.plot_surface(
+            X,
+            Y,
+            Z,
+            cmap="viridis",
+            edgecolor="none",
+            alpha=0.9,
+            rcount=len(Y),
+            ccount=len(X[0]),
+        )
+
+    focus = None
+    if trajectory is not None and len(trajectory):
+        focus = refinement_window(np.asarray(trajectory)[:, :2], x_range, y_range)
+    elif point is not None:
+        focus = refinement_window([point[:2]], x_range, y_range)
+    _refine_later(window, canvas, redraw, focus)
+
+
+def contour_plot(root, func_str, variables, point=None, trajectory=None):
+    """
+    Mapa de contornos de f en [-10, 10]² con el óptimo marcado y, si se da,
+    la trayectoria (m, 2) simplificada como en show_3d_plot.
+    """
     if len(variables) != 2:
         return
-    
-    x_sym, y_sym = symbols(variables)
-    f_lambdified = lambdify((x_sym, y_sym), func_str, "numpy")
-        
-    x_range = np.linspace(-10, 10, 100)
-    y_range = np.linspace(-10, 10, 100)
-    X, Y = np.meshgrid(x_range, y_range)
-    
+
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    x_range = y_range = (-10, 10)
     try:
-        Z = f_lambdified(X, Y)
+        X, Y, Z = surface_grid(func_str, variables, x_range, y_range, resolution=100)
     except Exception:
         from tkinter import messagebox
 
@@ -84,16 +290,35 @@ def contour_plot(root, func_str, variables, point=None):
 
     fig = plt.figure(figsize=(6, 4))
     ax_contour = fig.add_subplot(111)
-    contour = ax_contour.contourf(X, Y, Z, levels=20, cmap='cividis')
-    ax_contour.set_xlabel('x1')
-    ax_contour.set_ylabel('x2')
-    ax_contour.set_title('Contour Map')
-    ax_contour.set_aspect('equal', adjustable='box')
+    contour = ax_contour.contourf(X, Y, Z, levels=20, cmap="cividis")
+    levels = contour.levels
+    ax_contour.set_xlabel("x1")
+    ax_contour.set_ylabel("x2")
+    ax_contour.set_title("Contour Map")
+    ax_contour.set_aspect("equal", adjustable="box")
+
+    if trajectory is not None and len(trajectory):
+        path = np.asarray(trajectory, dtype=float)[:, :2]
+        path = path[simplify_path(path)]
+        segments, index = _trajectory_segments(path, x_range, y_range)
+        lines = LineCollection(segments, cmap="autumn", linewidths=1.5)
+        lines.set_array(index / max(len(path) - 1, 1))
+        ax_contour.add_collection(lines)
+        ax_contour.plot(*path[0], "o", color="lime", markersize=6, label="Start")
+        if point is None:
+            ax_contour.plot(*path[-1], "ro", markersize=6, label="End")
 
     if point is not None:
-        ax_contour.plot(point[0], point[1], 'ro', markersize=8, label=f'Optimal Point ({point[0]:.6f}, {point[1]:.6f})')
+        ax_contour.plot(
+            point[0],
+            point[1],
+            "ro",
+            markersize=8,
+            label=f"Optimal Point ({point[0]:.6f}, {point[1]:.6f})",
+        )
+    if point is not None or trajectory is not None:
         ax_contour.legend()
-    
+
     # Mostrar en ventana aparte
     import tkinter as tk
 
@@ -103,4 +328,59 @@ def contour_plot(root, func_str, variables, point=None):
     window.title("Contour Map Visualization")
     canvas = FigureCanvasTkAgg(fig, master=window)
     canvas.draw()
-    canvas.get_tk_widget().pack(fill="both", expand=True)
\ No newline at end of file
+    canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def redraw(focus):
+        nonlocal contour
+        X, Y, Z = surface_grid(
+            func_str,
+            variables,
+            x_range,
+            y_range,
+            resolution=100,
+            window=focus,
+            fine=150,
+        )
+        contour.remove()
+        contour = ax_contour.contourf(X, Y, Z, levels=levels, cmap="cividis", zorder=0)
+
+    focus = None
+    if trajectory is not None and len(trajectory):
+        focus = refinement_window(np.asarray(trajectory)[:, :2], x_range, y_range)
+    elif point is not None:
+        focus = refinement_window([point[:2]], x_range, y_range)
+    _refine_later(window, canvas, redraw, focus)
+
+
+def minmax_downsample(x, y, buckets):
+    """
+    Reduce una curva a lo sumo a 2·buckets + 2 puntos conservando, en cada
+    grupo de puntos consecutivos, el mínimo y el máximo de y (en su orden
+    original), más los dos extremos. Con un grupo por píxel la línea dibujada
+    es idéntica a la completa.
+
+    Parámetros:
+    - x, y: arreglos de la misma longitud (x ordenado, p. ej. iteraciones)
+    - buckets: número de grupos (ancho del eje en píxeles)
+
+    Retorna:
+    - (x, y) reducidos; los originales si ya caben
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    buckets = max(1, int(buckets))
+    if n <= 2 * buckets:
+        return x, y
+
+    size = -(-n // buckets)  # ceil(n / buckets)
+    full = n - n % size
+    groups = y[:full].reshape(-1, size)
+    offsets = np.arange(0, full, size)
+    index = [offsets + groups.argmin(axis=1), offsets + groups.argmax(axis=1)]
+    if full < n:
+        tail = y[full:]
+        index.append([full + tail.argmin(), full + tail.argmax()])
+    index.append([0, n - 1])
+    index = np.unique(np.concatenate(index))
+    return x[index], y[index]
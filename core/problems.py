@@ -0,0 +1,157 @@
+import numpy as np
+
+from core import functions
+from core.evaluation import array_native, batch_native
+from core.numdiff import gradient_difference_hvp
+from core.sparse import banded_pattern, compressed_hessian, sparsity_pattern
+
+
+class Problem:
+    """
+    Función de prueba con gradiente analítico (y producto Hessiana-vector si
+    está disponible), lista para pasarse directamente a los optimizadores:
+
+        problem = get_problem("rosenbrock")
+        x_opt, history = bfgs(problem.function, problem.gradient, x0,
+                              value_and_grad=problem.value_and_grad)
+
+    function, gradient, value_and_grad y hvp aceptan un punto (n,) o un lote
+    (k, n), así que también sirven para core.multistart.
+    """
+
+    def __init__(
+        self,
+        name,
+        function,
+        gradient,
+        hvp=None,
+        dimension=None,
+        sparsity=None,
+        **params,
+    ):
+        self.name = name
+        self.params = params
+        self.dimension = dimension  # None si admite cualquier n
+        self._sparsity = sparsity
+
+        @batch_native
+        @array_native
+        def value(x):
+            return function(x, **params)
+
+        @batch_native
+        @array_native
+        def grad(x, out=None):
+            g = gradient(x, **params)
+            if out is None:
+                return g
+            out[...] = g
+            return out
+
+        @batch_native
+        @array_native
+        def value_and_grad(x, out=None):
+            return value(x), grad(x, out)
+
+        self.function = value
+        self.gradient = grad
+        self.value_and_grad = value_and_grad
+        self.hvp = None
+
+        if hvp is not None:
+
+            def hessian_vector_product(x, v):
+                return hvp(x, v, **params)
+
+            self.hvp = hessian_vector_product
+
+    def hessian_pattern(self, n: int):
+        """Patrón CSR (indptr, indices) de la Hessiana en dimensión n, o None si es densa."""
+        if self._sparsity is None:
+            return None
+        return self._sparsity(n, **self.params)
+
+    def sparse_hessian(self, n: int):
+        """
+        hessian(x) -> core.sparse.CSRMatrix en dimensión n, con un producto
+        H·v por color del patrón (o diferencias del gradiente si no hay hvp).
+        None si la Hessiana del problema es densa.
+        """
+        pattern = self.hessian_pattern(n)
+        if pattern is None:
+            return None
+        hvp = self.hvp or gradient_difference_hvp(self.gradient)
+        return compressed_hessian(*pattern, hvp)
+
+    def __repr__(self):
+        return f"Problem({self.name!r}, params={self.params!r})"
+
+
+PROBLEMS = {}
+
+
+def register_problem(name, function, gradient, hvp=None, dimension=None, sparsity=None):
+    """
+    Registra una función de prueba con su gradiente (y H·v opcional).
+    sparsity(n, **params) -> (indptr, indices) da el patrón de la Hessiana si
+    es dispersa.
+    """
+    PROBLEMS[name] = (function, gradient, hvp, dimension, sparsity)
+
+
+def get_problem(name: str, **params) -> Problem:
+    """
+    Devuelve el problema registrado con ese nombre, con los parámetros de la
+    función fijados (p. ej. get_problem("rastrigin", A=5)).
+    """
+    if name not in PROBLEMS:
+        raise ValueError(f"Problema desconocido: {name}")
+    function, gradient, hvp, dimension, sparsity = PROBLEMS[name]
+    return Problem(name, function, gradient, hvp, dimension, sparsity, **params)
+
+
+def _diagonal_pattern(n, **params):
+    return banded_pattern(n, 0)
+
+
+def _tridiagonal_pattern(n, **params):
+    return banded_pattern(n, 1)
+
+
+def _quadratic_pattern(n, A=None, **params):
+    if A is None:
+        return banded_pattern(n, 0)
+    rows, cols = np.nonzero(np.asarray(A))
+    return sparsity_pattern(n, rows, cols)
+
+
+register_problem(
+    "quadratic",
+    functions.quadratic,
+    functions.quadratic_gradient,
+    functions.quadratic_hvp,
+    sparsity=_quadratic_pattern,
+)
+register_problem(
+    "rosenbrock",
+    functions.rosenbrock,
+    functions.rosenbrock_gradient,
+    functions.rosenbrock_hvp,
+    sparsity=_tridiagonal_pattern,
+)
+register_problem(
+    "rastrigin",
+    functions.rastrigin,
+    functions.rastrigin_gradient,
+    functions.rastrigin_hvp,
+    sparsity=_diagonal_pattern,
+)
+register_problem(
+    "himmelblau",
+    functions.himmelblau,
+    functions.himmelblau_gradient,
+    functions.himmelblau_hvp,
+    dimension=2,
+)
+register_problem("ackley", functions.ackley, functions.ackley_gradient)
+register_problem("griewank", functions.griewank, functions.griewank_gradient)
@@ -0,0 +1,239 @@
+import copy
+import operator
+from collections import deque
+
+import numpy as np
+
+
+class KeepAll:
+    """
+    Política de retención base: guarda todas las iteraciones.
+
+    Cada política decide con keep(k, f_x) si una iteración se conserva. Con
+    maxlen solo se guardan las últimas maxlen iteraciones conservadas (buffer
+    circular), así que la memoria queda acotada para corridas arbitrariamente
+    largas. La última iteración siempre se conserva aunque keep la descarte,
+    para que las curvas de convergencia terminen en el punto final.
+    """
+
+    def __init__(self, maxlen=None):
+        if maxlen is not None and maxlen < 1:
+            raise ValueError("maxlen debe ser al menos 1.")
+        self.maxlen = maxlen
+
+    def reset(self):
+        pass
+
+    def keep(self, k, f_x):
+        return True
+
+    def __repr__(self):
+        return f"{type(self).__name__}(maxlen={self.maxlen})"
+
+
+class EveryK(KeepAll):
+    """Guarda las iteraciones 1, 1 + step, 1 + 2·step, ..."""
+
+    def __init__(self, step, maxlen=None):
+        super().__init__(maxlen)
+        if step < 1:
+            raise ValueError("step debe ser al menos 1.")
+        self.step = int(step)
+
+    def keep(self, k, f_x):
+        return (k - 1) % self.step == 0
+
+    def __repr__(self):
+        return f"EveryK({self.step}, maxlen={self.maxlen})"
+
+
+class LogSpaced(KeepAll):
+    """
+    Guarda iteraciones espaciadas logarítmicamente (per_decade por década:
+    1, 2, 3, ..., 10, 13, 16, 20, ...), es decir O(log max_iter) registros.
+    """
+
+    def __init__(self, per_decade=10, maxlen=None):
+        super().__init__(maxlen)
+        if per_decade <= 0:
+            raise ValueError("per_decade debe ser positivo.")
+        self.per_decade = per_decade
+        self._ratio = 10 ** (1 / per_decade)
+        self._next = 1
+
+    def reset(self):
+        self._next = 1
+
+    def keep(self, k, f_x):
+        if k < self._next:
+            return False
+        self._next = max(k + 1, round(k * self._ratio))
+        return True
+
+    def __repr__(self):
+        return f"LogSpaced({self.per_decade}, maxlen={self.maxlen})"
+
+
+class LastN(KeepAll):
+    """Guarda solo las últimas n iteraciones (buffer circular)."""
+
+    def __init__(self, n):
+        super().__init__(maxlen=n)
+
+    def __repr__(self):
+        return f"LastN({self.maxlen})"
+
+
+class ImprovementThreshold(KeepAll):
+    """
+    Guarda la primera iteración, la última y las iteraciones en las que f baja
+    más de threshold respecto a la última guardada (relativo a |f| si
+    relative=True). El número de registros queda acotado por
+    (f_inicial - f_final) / threshold; con maxlen se acota además por tamaño.
+    """
+
+    def __init__(self, threshold, relative=False, maxlen=None):
+        super().__init__(maxlen)
+        self.threshold = threshold
+        self.relative = relative
+        self._reference = None
+
+    def reset(self):
+        self._reference = None
+
+    def keep(self, k, f_x):
+        reference = self._reference
+        if reference is not None:
+            margin = self.threshold * (abs(reference) if self.relative else 1.0)
+            if not reference - f_x > margin:
+                return False
+        self._reference = f_x
+        return True
+
+    def __repr__(self):
+        return (
+            f"ImprovementThreshold({self.threshold}, relative={self.relative}, "
+            f"maxlen={self.maxlen})"
+        )
+
+
+_POLICIES = {
+    "all": lambda: KeepAll(),
+    "every": lambda step: EveryK(int(step)),
+    "log": lambda per_decade=10: LogSpaced(float(per_decade)),
+    "last": lambda n: LastN(int(n)),
+    "improvement": lambda threshold: ImprovementThreshold(float(threshold)),
+}
+
+
+def make_policy(spec=None):
+    """
+    Construye una política de retención nueva a partir de:
+    - None o "all": todas las iteraciones
+    - "every:10", "log:20", "last:500", "improvement:1e-3"
+    - una instancia de política (se copia, porque las políticas guardan estado)
+    """
+    if spec is None:
+        return KeepAll()
+    if isinstance(spec, KeepAll):
+        policy = copy.copy(spec)
+        policy.reset()
+        return policy
+
+    name, _, arg = str(spec).partition(":")
+    factory = _POLICIES.get(name.strip().lower())
+    if factory is None:
+        raise ValueError(f"Política de retención desconocida: {spec}")
+    return factory(arg) if arg else factory()
+
+
+RECORD_MODES = ("none", "scalars", "full")
+
+
+def readonly_view(array):
+    """
+    Vista de solo lectura (sin copia) de un arreglo del optimizador. Refleja el
+    estado en el momento de la llamada; si se quiere conservar hay que copiarla.
+    """
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class History:
+    """
+    Historial de iteraciones de un optimizador con memoria acotada según una
+    política de retención. Se usa como una lista de tuplas (k, x, f(x), ...)
+    de las iteraciones guardadas (len y bool cuentan solo esas); total cuenta
+    todas las registradas, incluidas las descartadas.
+
+    record elige qué se guarda: "full" (tuplas con una copia de x), "scalars"
+    (x es None, solo k, f(x), ||grad|| y extras) o "none" (solo total).
+    """
+
+    def __init__(self, retention=None, record="full"):
+        if record not in RECORD_MODES:
+            raise ValueError(f"record debe ser uno de {RECORD_MODES}.")
+        self.record = record
+        self.policy = make_policy(retention)
+        self._kept = deque(maxlen=self.policy.maxlen)
+        self._last = None
+        self._last_x = None  # buffer reutilizado para la última iteración
+        self.total = 0
+
+    def add(self, k, x, f_x, norm_grad, *extra):
+        """Registra una iteración copiando x solo si se va a conservar."""
+        self.total += 1
+        if self.record == "none":
+            return
+        if self.policy.keep(k, f_x):
+            x = x.copy() if self.record == "full" else None
+            self._kept.append((k, x, f_x, norm_grad, *extra))
+            self._last = None
+            return
+        if self.record == "full":
+            if self._last_x is None or self._last_x.shape != x.shape:
+                self._last_x = np.empty_like(x)
+            np.copyto(self._last_x, x)
+            x = self._last_x
+        else:
+            x = None
+        self._last = (k, x, f_x, norm_grad, *extra)
+
+    def append(self, entry):
+        self.total += 1
+        if self.record == "none":
+            return
+        if self.policy.keep(entry[0], entry[2]):
+            self._kept.append(entry)
+            self._last = None
+        else:
+            self._last = entry
+
+    def _entries(self):
+        if self._last is None:
+            return list(self._kept)
+        return [*self._kept, self._last]
+
+    def __len__(self):
+        return len(self._kept) + (self._last is not None)
+
+    def __iter__(self):
+        return iter(self._entries())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._entries()[index]
+        # Acceso directo al deque: recorrer h[i] no reconstruye la lista
+        size = len(self)
+        index = operator.index(index)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("índice fuera del historial")
+        if index == len(self._kept):
+            return self._last
+        return self._kept[index]
+
+    def __repr__(self):
+        return f"History({len(self)} de {self.total} iteraciones, {self.policy!r})"
@@ -0,0 +1,163 @@
+import time
+
+import numpy as np
+
+from core.evaluation import counting
+from core.gradients import compile_objective
+from core.line_search import armijo_backtracking, wolfe_line_search
+from core.numdiff import numerical_gradient, numerical_value_and_grad
+from core.optimizers import adam, bfgs, gradient_descent, lbfgs, newton_cg
+from core.problems import get_problem
+from core.stochastic import stochastic_gradient_descent
+
+METHODS = {
+    "gradient_descent": gradient_descent,
+    "bfgs": bfgs,
+    "lbfgs": lbfgs,
+    "newton_cg": newton_cg,
+    "adam": adam,
+    "sgd": stochastic_gradient_descent,
+}
+
+LINE_SEARCHES = {
+    None: None,
+    "none": None,
+    "armijo": armijo_backtracking,
+    "wolfe": wolfe_line_search,
+}
+
+# Métodos cuya firma acepta line_search
+_USES_LINE_SEARCH = {"gradient_descent", "bfgs", "lbfgs", "newton_cg"}
+
+
+def resolve_objective(job: dict):
+    """
+    Obtiene (f, grad_f, value_and_grad) en forma nativa sobre arreglos para un
+    trabajo. El trabajo define "expression" y "variables", o "function" con
+    el nombre de un problema de core.problems (funciones de core.functions con
+    gradiente analítico) y sus "params" opcionales.
+
+    "gradient" elige el backend de gradiente de una expresión ("sympy" por
+    defecto, "autodiff" o "finite-diff"); en un problema solo se admite
+    "finite-diff" en lugar del gradiente analítico.
+    """
+    backend = job.get("gradient")
+    if "expression" in job:
+        compiled = compile_objective(
+            job["expression"], job["variables"], backend or "sympy"
+        )
+        return (
+            compiled.array_function,
+            compiled.array_gradient,
+            compiled.array_value_and_grad,
+        )
+
+    problem = get_problem(job["function"], **job.get("params", {}))
+    if backend == "finite-diff":
+        return (
+            problem.function,
+            numerical_gradient(problem.function),
+            numerical_value_and_grad(problem.function),
+        )
+    if backend is not None:
+        raise ValueError(f"Backend de gradiente no aplicable a un problema: {backend}")
+    return problem.function, problem.gradient, problem.value_and_grad
+
+
+def resolve_hvp(job: dict):
+    """
+    Producto Hessiana-vector hvp(x, v) del objetivo de un trabajo, o None si
+    no hay uno exacto (newton_cg usa entonces diferencias del gradiente).
+    """
+    backend = job.get("gradient")
+    if "expression" in job:
+        compiled = compile_objective(
+            job["expression"], job["variables"], backend or "sympy"
+        )
+        return compiled.array_hvp
+    if backend == "finite-diff":
+        return None
+    return get_problem(job["function"], **job.get("params", {})).hvp
+
+
+def resolve_hessian(job: dict):
+    """
+    hessian(x) -> core.sparse.CSRMatrix para newton_cg si el trabajo pide
+    "hessian": "sparse", o None (por defecto "hvp": solo productos H·v).
+    """
+    mode = job.get("hessian", "hvp")
+    if mode == "hvp":
+        return None
+    if mode != "sparse":
+        raise ValueError(f"Modo de Hessiana desconocido: {mode}")
+
+    if "expression" in job:
+        compiled = compile_objective(
+            job["expression"], job["variables"], job.get("gradient") or "sympy"
+        )
+        hessian = compiled.sparse_hessian
+    else:
+        problem = get_problem(job["function"], **job.get("params", {}))
+        hessian = problem.sparse_hessian(len(job["x0"]))
+    if hessian is None:
+        raise ValueError("El objetivo no tiene un patrón de Hessiana disperso.")
+    return hessian
+
+
+def run_job(job: dict) -> dict:
+    """
+    Ejecuta un trabajo de optimización y devuelve sus resultados.
+
+    Claves del trabajo:
+    - "expression" + "variables", o "function" (+ "params"): objetivo
+    - "method": nombre en METHODS (por defecto "gradient_descent")
+    - "line_search": None, "armijo" o "wolfe"
+    - "gradient": backend de gradiente, opcional (ver resolve_objective)
+    - "hessian": "hvp" (por defecto) o "sparse" para newton_cg (ver
+      resolve_hessian)
+    - "x0": punto inicial
+    - "options": hiperparámetros del método (tol, max_iter, learning_rate, ...)
+    - "id": identificador opcional que se copia al resultado
+
+    Retorna:
+    - diccionario con id, method, x_opt, f, iterations, time, f_evals y grad_evals
+    """
+    method_name = job.get("method", "gradient_descent")
+    method = METHODS.get(method_name)
+    if method is None:
+        raise ValueError(f"Método desconocido: {method_name}")
+    line_search_name = job.get("line_search")
+    if line_search_name not in LINE_SEARCHES:
+        raise ValueError(f"Búsqueda lineal desconocida: {line_search_name}")
+
+    objective, grad_f, value_and_grad = resolve_objective(job)
+    eval_count = {"f": 0, "grad": 0}
+    f = counting(objective, eval_count, "f")
+    grad_f = counting(grad_f, eval_count, "grad")
+    if value_and_grad is not None:
+        value_and_grad = counting(value_and_grad, eval_count, "f", "grad")
+
+    kwargs = dict(job.get("options", {}))
+    kwargs.setdefault("record", "none")  # solo se reportan x final y el conteo
+    line_search = LINE_SEARCHES[line_search_name]
+    if line_search is not None and method_name in _USES_LINE_SEARCH:
+        kwargs["line_search"] = line_search
+    if method_name == "newton_cg":
+        kwargs["hvp"] = resolve_hvp(job)
+        kwargs["hessian"] = resolve_hessian(job)
+
+    x0 = np.array(job["x0"], dtype=float)
+    start_time = time.perf_counter()
+    x_opt, history = method(f, grad_f, x0, value_and_grad=value_and_grad, **kwargs)
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "id": job.get("id"),
+        "method": method_name,
+        "x_opt": x_opt.tolist(),
+        "f": float(objective(x_opt)),
+        "iterations": history.total,
+        "time": elapsed,
+        "f_evals": eval_count["f"],
+        "grad_evals": eval_count["grad"],
+    }
@@ -0,0 +1,138 @@
+import numpy as np
+
+# Hessianas dispersas sin scipy: patrón CSR (indptr, indices), coloreo de
+# columnas para recuperar todos los valores con pocos productos H·v, y una
+# matriz CSR mínima con producto matriz-vector para los pasos de Newton.
+
+
+class CSRMatrix:
+    """
+    Matriz dispersa n×n en formato CSR: las columnas de la fila i son
+    indices[indptr[i]:indptr[i + 1]] y sus valores los mismos tramos de data.
+    Memoria O(n + nnz).
+    """
+
+    def __init__(self, indptr, indices, data, shape=None):
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.data = np.asarray(data, dtype=float)
+        n = len(self.indptr) - 1
+        self.shape = shape or (n, n)
+        self._rows = np.repeat(np.arange(n), np.diff(self.indptr))
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def matvec(self, v: np.ndarray) -> np.ndarray:
+        """A v en O(nnz)."""
+        products = self.data * np.asarray(v)[self.indices]
+        return np.bincount(self._rows, weights=products, minlength=self.shape[0])
+
+    __matmul__ = matvec
+
+    def diagonal(self) -> np.ndarray:
+        diag = np.zeros(self.shape[0])
+        on_diagonal = self._rows == self.indices
+        diag[self._rows[on_diagonal]] = self.data[on_diagonal]
+        return diag
+
+    def toarray(self) -> np.ndarray:
+        dense = np.zeros(self.shape)
+        dense[self._rows, self.indices] = self.data
+        return dense
+
+    def __repr__(self):
+        return f"CSRMatrix(shape={self.shape}, nnz={self.nnz})"
+
+
+def sparsity_pattern(n: int, rows, cols) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Patrón CSR simétrico (indptr, indices) con las posiciones (rows, cols),
+    sus simétricas y la diagonal, sin repetidos y con columnas ordenadas.
+    """
+    rows = np.asarray(rows, dtype=np.intp)
+    cols = np.asarray(cols, dtype=np.intp)
+    diagonal = np.arange(n)
+    keys = np.unique(
+        np.concatenate([rows, cols, diagonal]) * n
+        + np.concatenate([cols, rows, diagonal])
+    )
+    rows, cols = np.divmod(keys, n)
+    indptr = np.zeros(n + 1, dtype=np.intp)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols
+
+
+def banded_pattern(n: int, bandwidth: int) -> tuple[np.ndarray, np.ndarray]:
+    """Patrón de una matriz con banda |i - j| ≤ bandwidth (0: diagonal)."""
+    rows = [np.arange(n - k) for k in range(1, bandwidth + 1)]
+    cols = [np.arange(k, n) for k in range(1, bandwidth + 1)]
+    empty = np.empty(0, dtype=np.intp)
+    return sparsity_pattern(
+        n, np.concatenate([empty, *rows]), np.concatenate([empty, *cols])
+    )
+
+
+def color_columns(indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Coloreo voraz de columnas estructuralmente ortogonales: dos columnas con
+    el mismo color no comparten ninguna fila no nula, así que un único
+    producto H·s con s = Σ e_j (j del color) da todas sus entradas.
+
+    Las columnas se recorren de mayor a menor grado; en una matriz con banda
+    b se obtienen 2b + 1 colores sin importar n.
+
+    Retorna:
+    - colors: color de cada columna (n,), de 0 a n_colores - 1
+    """
+    n = len(indptr) - 1
+    colors = np.full(n, -1, dtype=np.intp)
+    degree = np.diff(indptr)
+    # Patrón simétrico: las filas no nulas de la columna j son las de la fila j
+    rows_of = [indices[indptr[j] : indptr[j + 1]] for j in range(n)]
+    for j in np.argsort(-degree, kind="stable"):
+        forbidden = set()
+        for row in rows_of[j]:
+            forbidden.update(colors[rows_of[row]].tolist())
+        color = 0
+        while color in forbidden:
+            color += 1
+        colors[j] = color
+    return colors
+
+
+def compressed_hessian(indptr, indices, hvp, colors=None):
+    """
+    Construye hessian(x) -> CSRMatrix a partir de productos Hessiana-vector,
+    con un producto por color (ver color_columns) en lugar de uno por columna.
+
+    Parámetros:
+    - indptr, indices: patrón CSR simétrico de la Hessiana
+    - hvp: producto hvp(x, v) -> H(x) v (analítico, compilado o por
+      diferencias del gradiente)
+    - colors: coloreo de columnas; por defecto color_columns(indptr, indices)
+
+    Retorna:
+    - hessian: hessian(x) -> CSRMatrix con los valores de H(x) en el patrón
+    """
+    if colors is None:
+        colors = color_columns(indptr, indices)
+    n = len(indptr) - 1
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    entry_colors = colors[indices]
+    # Para cada color: sus entradas en data, la fila de cada una y la semilla
+    groups = []
+    for color in range(colors.max() + 1 if n else 0):
+        entries = np.flatnonzero(entry_colors == color)
+        groups.append((entries, rows[entries], colors == color))
+
+    def hessian(x):
+        data = np.empty(len(indices))
+        for entries, entry_rows, seed in groups:
+            Hs = hvp(x, seed.astype(float))
+            data[entries] = Hs[entry_rows]
+        return CSRMatrix(indptr, indices, data)
+
+    hessian.n_colors = len(groups)
+    return hessian
@@ -1,5 +1,8 @@
 import numpy as np
 
+from core.evaluation import objective_evaluator
+from core.retention import History, readonly_view
+
 
 def stochastic_gradient_descent(
     f,
@@ -10,6 +13,9 @@ def stochastic_gradient_descent(
     max_iter=100,
     noise_scale=1e-3,
     callback=None,
+    value_and_grad=None,
+    retention=None,
+    record: str = "full",
 ):
     """
     Stochastic Gradient Descent (SGD)
@@ -22,26 +28,38 @@ def stochastic_gradient_descent(
     - tol: tolerancia para ||∇f||
     - max_iter: número máximo de iteraciones
     - noise_scale: amplitud del ruido gaussiano aplicado al gradiente
-    - callback: función opcional que recibe (k, x, f(x), grad, ||grad||, alpha)
+    - callback: función opcional que recibe (k, x, f(x), grad, ||grad||, alpha);
+      si devuelve True la optimización se detiene
+    - value_and_grad: función fusionada (x desempaquetado o nativa), opcional
+    - retention: política de retención del historial (core.retention), opcional
+    - record: qué guarda el historial: "full", "scalars" o "none"
 
     Retorna:
     - x_opt: punto final
     - history: lista con tuplas (k, x, f(x), ||grad||)
     """
-    x = x0.copy()
-    history = []
+    x = np.array(x0, dtype=float)
+    history = History(retention, record)
+    evaluate = objective_evaluator(f, grad_f, value_and_grad)
+    grad = np.empty_like(x)
 
     for k in range(1, max_iter + 1):
-        grad = np.array(grad_f(*x), dtype=float)
+        f_x, grad = evaluate(x, grad)
         noise = np.random.normal(0, noise_scale, size=grad.shape)
         grad_noisy = grad + noise
         norm_grad = np.linalg.norm(grad)
 
-        f_x = f(*x)
-        history.append((k, x.copy(), f_x, norm_grad))
+        history.add(k, x, f_x, norm_grad)
 
-        if callback:
-            callback(k, x.copy(), f_x, grad_noisy, norm_grad, learning_rate)
+        if callback and callback(
+            k,
+            readonly_view(x),
+            f_x,
+            readonly_view(grad_noisy),
+            norm_grad,
+            learning_rate,
+        ):
+            break  # detención solicitada por el callback
 
         if norm_grad < tol:
             break
@@ -0,0 +1,77 @@
+import queue
+import threading
+import time
+
+
+class OptimizationWorker:
+    """
+    Ejecuta una optimización en un hilo en segundo plano y envía su progreso
+    por una cola segura entre hilos, para que la interfaz no se bloquee.
+
+    run(callback) debe lanzar la optimización pasando callback al optimizador
+    y devolver su resultado. El callback acumula las iteraciones y las envía
+    en lotes cada flush_interval segundos; devuelve True tras cancel(), lo que
+    detiene el optimizador en la siguiente iteración.
+
+    Mensajes de la cola (leídos con poll()):
+    - ("iterations", [(k, x, f_x, norm_grad, alpha, info), ...])
+    - ("done", resultado de run)
+    - ("error", excepción)
+    """
+
+    def __init__(self, run, flush_interval=0.05):
+        self.messages = queue.Queue()
+        self.flush_interval = flush_interval
+        self._run = run
+        self._cancel = threading.Event()
+        self._batch = []
+        self._last_flush = time.perf_counter()
+        self._thread = threading.Thread(target=self._main, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Pide al optimizador que se detenga (cooperativamente)."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def callback(self, k, x, f_x, grad_x, norm_grad, alpha=None, **info):
+        # x es una vista de solo lectura del optimizador: se copia para la cola
+        self._batch.append((k, x.copy(), f_x, norm_grad, alpha, info))
+        now = time.perf_counter()
+        if now - self._last_flush >= self.flush_interval:
+            self._flush(now)
+        return self._cancel.is_set()
+
+    def _flush(self, now=None):
+        if self._batch:
+            self.messages.put(("iterations", self._batch))
+            self._batch = []
+        self._last_flush = time.perf_counter() if now is None else now
+
+    def _main(self):
+        try:
+            result = self._run(self.callback)
+        except Exception as e:
+            self._flush()
+            self.messages.put(("error", e))
+        else:
+            self._flush()
+            self.messages.put(("done", result))
+
+    def poll(self) -> list:
+        """Devuelve sin bloquear todos los mensajes pendientes."""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
@@ -0,0 +1,161 @@
+from tkinter import ttk
+
+import numpy as np
+
+from core.plotting import minmax_downsample
+
+
+class VirtualTable(ttk.Frame):
+    """
+    Tabla de iteraciones virtualizada: el Treeview solo contiene las filas
+    visibles (height) y se rellenan desde los arreglos de columnas, así que el
+    costo no depende del número de iteraciones.
+
+    set_data(*columns) recibe arreglos de igual longitud (p. ej. las columnas
+    del OptimizerLogger); formats es una función de formato por columna. Si la
+    vista estaba al final, sigue a las filas nuevas.
+    """
+
+    def __init__(self, master, columns, formats, height=19, **kwargs):
+        super().__init__(master, **kwargs)
+        self.height = height
+        self.formats = formats
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=height)
+        for col in columns:
+            self.tree.heading(col, text=col)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.grid_columnconfigure(0, weight=1)
+
+        self._columns = ()
+        self._rows = 0
+        self._offset = 0
+        self._items = []
+        self.refresh()
+
+    def set_data(self, *columns):
+        following = self._offset + self.height >= self._rows
+        self._columns = columns
+        self._rows = len(columns[0]) if columns else 0
+        if following:
+            self._offset = self._rows - self.height
+        self._clamp()
+        self.refresh()
+
+    def clear(self):
+        self.set_data()
+
+    def _clamp(self):
+        self._offset = max(0, min(self._offset, self._rows - self.height))
+
+    def refresh(self):
+        visible = range(self._offset, min(self._offset + self.height, self._rows))
+        while len(self._items) < len(visible):
+            self._items.append(self.tree.insert("", "end"))
+        while len(self._items) > len(visible):
+            self.tree.delete(self._items.pop())
+
+        for item, i in zip(self._items, visible):
+            values = [fmt(col[i]) for fmt, col in zip(self.formats, self._columns)]
+            self.tree.item(item, values=values)
+
+        if self._rows:
+            self.scrollbar.set(self._offset / self._rows, visible.stop / self._rows)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def yview(self, *args):
+        """Protocolo de comando de ttk.Scrollbar ("moveto" / "scroll")."""
+        if args[0] == "moveto":
+            self._offset = int(round(float(args[1]) * self._rows))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.height
+            self._offset += step
+        self._clamp()
+        self.refresh()
+
+    def yview_scroll(self, number, what):
+        self.yview("scroll", number, what)
+
+
+class ConvergencePlot:
+    """
+    Curva de convergencia que se actualiza sin redibujar la figura: la línea
+    existente se modifica con set_data y se pinta con blitting sobre el fondo
+    guardado. Solo se redibuja todo cuando los datos salen de los límites
+    (el eje x se amplía con holgura para que eso ocurra pocas veces).
+
+    Los datos se reducen a un mínimo/máximo por píxel, así que el costo de
+    dibujo no depende del número de iteraciones.
+    """
+
+    MARKER_LIMIT = 200  # se muestran marcadores solo con pocas iteraciones
+
+    def __init__(self, canvas, ax, title, xlabel, ylabel, **line_kwargs):
+        self.canvas = canvas
+        self.ax = ax
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.line_kwargs = line_kwargs
+        self._background = None
+        canvas.mpl_connect("draw_event", self._on_draw)
+        self.reset()
+
+    def reset(self):
+        ax = self.ax
+        ax.clear()
+        (self.line,) = ax.plot([], [], linestyle="-", animated=True, **self.line_kwargs)
+        ax.set_title(self.title)
+        ax.set_xlabel(self.xlabel)
+        ax.set_ylabel(self.ylabel)
+        ax.grid(True)
+        self._background = None
+        self.canvas.draw_idle()
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+
+    def update(self, x, y, final=False):
+        """
+        Muestra (x, y). Con final=True ajusta los límites a los datos sin
+        holgura (al terminar la ejecución).
+        """
+        x, y = minmax_downsample(x, y, self.ax.bbox.width)
+        self.line.set_data(x, y)
+        self.line.set_marker("o" if len(x) <= self.MARKER_LIMIT else "")
+
+        if final or self._background is None or not self._fits(x, y):
+            self._rescale(x, y, headroom=1.0 if final else 1.5)
+            self.canvas.draw_idle()  # _on_draw vuelve a capturar el fondo
+            return
+
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
+
+    def _fits(self, x, y):
+        if not len(x):
+            return True
+        y = y[np.isfinite(y)]
+        (x_min, x_max), (y_min, y_max) = self.ax.get_xlim(), self.ax.get_ylim()
+        return (
+            x_min <= x[0]
+            and x[-1] <= x_max
+            and (not len(y) or (y_min <= y.min() and y.max() <= y_max))
+        )
+
+    def _rescale(self, x, y, headroom):
+        if not len(x):
+            return
+        x_last = x[0] + max(x[-1] - x[0], 1) * headroom
+        self.ax.set_xlim(x[0], x_last)
+        y = y[np.isfinite(y)]
+        if len(y):
+            low, high = y.min(), y.max()
+            margin = 0.05 * (high - low) or 0.05 * abs(high) or 1.0
+            self.ax.set_ylim(low - margin, high + margin)
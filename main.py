@@ -1,19 +1,37 @@
 import os
 import sys
+import threading
 import time
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-from core.gradients import symbolic_function, symbolic_gradient
-from core.line_search import armijo_backtracking, wolfe_line_search
+from core.evaluation import counting
+from core.gradients import GRADIENT_BACKENDS, compile_objective
 from core.logger import OptimizerLogger
-from core.optimizers import adam, bfgs, gradient_descent
 from core.plotting import contour_plot, show_3d_plot
-from core.stochastic import stochastic_gradient_descent
+from core.runner import LINE_SEARCHES, METHODS
+from core.worker import OptimizationWorker
+from gui.widgets import ConvergencePlot, VirtualTable
+
+METHOD_NAMES = {
+    "Gradient Descent": "gradient_descent",
+    "BFGS": "bfgs",
+    "L-BFGS": "lbfgs",
+    "Newton-CG": "newton_cg",
+    "Adam": "adam",
+    "SGD": "sgd",
+}
+
+POLL_INTERVAL_MS = 100  # frecuencia con la que la interfaz lee el progreso
+WARM_UP_DELAY_MS = 200  # espera tras mostrar la ventana antes del precalentamiento
+FIGURE_SIZE = (6, 2.5)
+FIGURE_DPI = 100
+
+
+def format_alpha(alpha):
+    return f"{alpha:.6f}" if alpha and not np.isnan(alpha) else "-"
 
 
 class OptimizerApp(tk.Tk):
@@ -29,8 +47,7 @@ class OptimizerApp(tk.Tk):
             theme_path = os.path.join(sys._MEIPASS, "azure", "azure.tcl")
         else:
             theme_path = os.path.join("azure", "azure.tcl")
-        self.tk.call("source", theme_path)
-        self.tk.call("set_theme", "light")
+        self.load_theme(theme_path, "light")
 
         # Canvas + Scrollbar
         self.container = ttk.Frame(self)
@@ -71,6 +88,47 @@ class OptimizerApp(tk.Tk):
         )
 
         self.create_widgets()
+        self.after(WARM_UP_DELAY_MS, self.warm_up)
+
+    def load_theme(self, theme_path, mode):
+        """
+        Carga el tema Azure en el modo pedido. azure.tcl crea los temas claro
+        y oscuro (cada uno carga decenas de imágenes); aquí se omite el que no
+        se usa. Si el archivo no tiene la forma esperada se carga completo.
+        """
+        unused = "dark" if mode == "light" else "light"
+        try:
+            with open(theme_path, encoding="utf-8") as file:
+                script = file.read()
+            script = "\n".join(
+                line
+                for line in script.splitlines()
+                if not (line.startswith("source") and f"{unused}.tcl" in line)
+            )
+            # [info script] debe apuntar a azure.tcl para resolver theme/*.tcl
+            self.tk.call("info", "script", os.path.abspath(theme_path))
+            self.tk.eval(script)
+            self.tk.call("info", "script", "")
+        except (OSError, tk.TclError):
+            self.tk.call("source", theme_path)
+        self.tk.call("set_theme", mode)
+
+    def warm_up(self):
+        """
+        Tras mostrar la ventana: construye las figuras y, en segundo plano,
+        importa sympy y compila la expresión inicial (queda en la caché).
+        """
+        self.build_figures()
+        func_str = self.func_entry.get()
+        variables = [v.strip() for v in self.vars_entry.get().split(",")]
+
+        def compile_initial():
+            try:
+                compile_objective(func_str, variables)
+            except Exception:
+                pass  # la expresión se valida de nuevo al pulsar Run
+
+        threading.Thread(target=compile_initial, daemon=True).start()
 
     def create_widgets(self):
         style = ttk.Style()
@@ -126,7 +184,8 @@ class OptimizerApp(tk.Tk):
 
         ttk.Label(self.primary_frame, text="Method:").grid(row=5, column=0, sticky="w")
         self.method_combo = ttk.Combobox(
-            self.primary_frame, values=["Gradient Descent", "BFGS", "Adam", "SGD"]
+            self.primary_frame,
+            values=list(METHOD_NAMES),
         )
         self.method_combo.set("Gradient Descent")
         self.method_combo.grid(row=5, column=1, pady=5)
@@ -154,13 +213,39 @@ class OptimizerApp(tk.Tk):
         self.search_combo.set("None")
         self.search_combo.grid(row=7, column=1, pady=5)
 
+        ttk.Label(self.primary_frame, text="Gradient:").grid(
+            row=7, column=2, sticky="w", padx=5
+        )
+        self.gradient_combo = ttk.Combobox(
+            self.primary_frame, values=list(GRADIENT_BACKENDS), width=15
+        )
+        self.gradient_combo.set("sympy")
+        self.gradient_combo.grid(row=7, column=3, pady=5)
+
+        ttk.Label(self.primary_frame, text="History:").grid(
+            row=8, column=2, sticky="w", padx=5
+        )
+        self.retention_combo = ttk.Combobox(
+            self.primary_frame,
+            values=["all", "every:10", "log:20", "last:1000", "improvement:1e-6"],
+            width=15,
+        )
+        self.retention_combo.set("all")
+        self.retention_combo.grid(row=8, column=3, pady=5)
+
         self.run_button = ttk.Button(
             self.primary_frame,
             text="Run",
             command=self.run_optimization,
         )
 
-        self.run_button.grid(row=9, column=0, columnspan=2, pady=10)
+        self.run_button.grid(row=9, column=0, pady=10)
+        self.cancel_button = ttk.Button(
+            self.primary_frame, text="Cancel", command=self.cancel_optimization
+        )
+        self.cancel_button.grid(row=9, column=1, pady=10)
+        self.cancel_button.state(["disabled"])
+        self.worker = None
         self.plot3d_button = ttk.Button(
             self.primary_frame, text="Show 3D Plot", command=self.on_show_3d_plot
         )
@@ -188,13 +273,13 @@ class OptimizerApp(tk.Tk):
         ttk.Label(
             self.secondary_frame, text="Iterations:", font=("Arial", 12, "bold")
         ).grid(row=1, column=0, sticky="w", padx=5)
-        columns = ("iter", "f_x", "norm_grad", "alpha")
-        self.tree = ttk.Treeview(
-            self.secondary_frame, columns=columns, show="headings", height=19
+        self.table = VirtualTable(
+            self.secondary_frame,
+            columns=("iter", "f_x", "norm_grad", "alpha"),
+            formats=(str, "{:.6f}".format, "{:.6f}".format, format_alpha),
+            height=19,
         )
-        for col in columns:
-            self.tree.heading(col, text=col)
-        self.tree.grid(row=2, column=0, columnspan=4, padx=10, pady=10, sticky="nsew")
+        self.table.grid(row=2, column=0, columnspan=4, padx=10, pady=10, sticky="nsew")
 
         self.grid_columnconfigure(1, weight=1)
 
@@ -203,26 +288,59 @@ class OptimizerApp(tk.Tk):
         )
         self.terciary_frame.grid(column=0, columnspan=4, row=2, pady=10)
 
-        self.figure = plt.Figure(figsize=(6, 2.5), dpi=100)
+        # Las figuras se construyen después de mostrar la ventana (build_figures);
+        # mientras tanto ocupan su lugar marcos del mismo tamaño
+        width, height = (FIGURE_DPI * size for size in FIGURE_SIZE)
+        self.figure_placeholders = []
+        for column in (0, 4):
+            placeholder = ttk.Frame(self.terciary_frame, width=width, height=height)
+            placeholder.grid(
+                row=0, column=column, columnspan=4, padx=10, pady=10, sticky="nsew"
+            )
+            self.figure_placeholders.append(placeholder)
+        self.fx_plot = self.grad_plot = None
+
+        self.stats_label = ttk.Label(self.terciary_frame, text="")
+        self.stats_label.grid(
+            row=1,
+            column=2,
+            columnspan=4,
+            pady=10,
+        )
+
+    def build_figures(self):
+        if self.fx_plot is not None:
+            return
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        for placeholder in self.figure_placeholders:
+            placeholder.destroy()
+
+        self.figure = Figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
         self.ax = self.figure.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.figure, self.terciary_frame)
         self.canvas.get_tk_widget().grid(
             row=0, column=0, columnspan=4, padx=10, pady=10, sticky="nsew"
         )
 
-        self.figure2 = plt.Figure(figsize=(6, 2.5), dpi=100)
+        self.figure2 = Figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
         self.ax2 = self.figure2.add_subplot(111)
         self.canvas2 = FigureCanvasTkAgg(self.figure2, self.terciary_frame)
         self.canvas2.get_tk_widget().grid(
             row=0, column=4, columnspan=4, padx=10, pady=10, sticky="nsew"
         )
 
-        self.stats_label = ttk.Label(self.terciary_frame, text="")
-        self.stats_label.grid(
-            row=1,
-            column=2,
-            columnspan=4,
-            pady=10,
+        self.fx_plot = ConvergencePlot(
+            self.canvas, self.ax, "Convergence of f(x)", "Iteration", "f(x)"
+        )
+        self.grad_plot = ConvergencePlot(
+            self.canvas2,
+            self.ax2,
+            "Convergence of ‖∇f(x)‖",
+            "Iteration",
+            "‖∇f‖",
+            color="orange",
         )
 
     def on_mousewheel(self, event):
@@ -237,8 +355,8 @@ class OptimizerApp(tk.Tk):
         else:
             return
 
-        if widget.winfo_class() == "Treeview":
-            widget.yview_scroll(delta, "units")
+        if widget is self.table.tree:
+            self.table.yview_scroll(delta, "units")
             return "break"
         else:
             self.canvas_container.yview_scroll(delta, "units")
@@ -247,148 +365,142 @@ class OptimizerApp(tk.Tk):
         try:
             func_str = self.func_entry.get()
             variables = [v.strip() for v in self.vars_entry.get().split(",")]
-            f = symbolic_function(func_str, variables)
-            grad_f = symbolic_gradient(func_str, variables)
             x0 = np.array([float(val) for val in self.x0_entry.get().split(",")])
             tol = float(self.tol_entry.get())
             learning_rate = float(self.lr_entry.get())
             max_iter = int(self.max_iter_entry.get())
+            retention = self.retention_combo.get()
+            line_search = LINE_SEARCHES[self.search_combo.get().lower()]
+            method_name = METHOD_NAMES[self.method_combo.get()]
+            backend = self.gradient_combo.get()
+            if backend not in GRADIENT_BACKENDS:
+                raise ValueError(f"Backend de gradiente desconocido: {backend}")
+            self.logger = OptimizerLogger(store_grad=False, retention=retention)
+        except Exception as e:
+            messagebox.showerror("Error", f"{type(e).__name__}: {str(e)}")
+            return
 
-            logger = OptimizerLogger()
-            logger.reset()  # por si se ejecuta múltiples veces
+        options = {"tol": tol, "max_iter": max_iter, "retention": retention}
+        if method_name in ("adam", "sgd"):
+            options["learning_rate"] = learning_rate
+        else:
+            options["line_search"] = line_search
 
+        def run(callback):
+            # Se ejecuta en el hilo del worker (incluida la compilación simbólica)
+            compiled = compile_objective(func_str, variables, backend)
             eval_count = {"f": 0, "grad": 0}
-
-            def wrapped_f(*args):
-                eval_count["f"] += 1
-                return f(*args)
-
-            def wrapped_grad_f(*args):
-                eval_count["grad"] += 1
-                return grad_f(*args)
-
-            ls_option = self.search_combo.get()
-            if ls_option == "Armijo":
-                line_search = armijo_backtracking
-            elif ls_option == "Wolfe":
-                line_search = wolfe_line_search
-            else:
-                line_search = None
-
-            method = self.method_combo.get()
-            start_time = time.perf_counter()
-
-            if method == "BFGS":
-                x_opt, _ = bfgs(
-                    wrapped_f,
-                    wrapped_grad_f,
-                    x0,
-                    tol=tol,
-                    max_iter=max_iter,
-                    line_search=line_search,
-                    callback=logger,
-                )
-            elif method == "Adam":
-                x_opt, _ = adam(
-                    wrapped_f,
-                    wrapped_grad_f,
-                    x0,
-                    tol=tol,
-                    max_iter=max_iter,
-                    learning_rate=learning_rate,
-                    callback=logger,
-                )
-            elif method == "SGD":
-                x_opt, _ = stochastic_gradient_descent(
-                    wrapped_f,
-                    wrapped_grad_f,
-                    x0,
-                    tol=tol,
-                    max_iter=max_iter,
-                    learning_rate=learning_rate,
-                    callback=logger,
-                )
-            else:
-                x_opt, _ = gradient_descent(
-                    wrapped_f,
-                    wrapped_grad_f,
-                    x0,
-                    tol=tol,
-                    max_iter=max_iter,
-                    line_search=line_search,
-                    callback=logger,
-                )
-
-            end_time = time.perf_counter()
-            elapsed = end_time - start_time
-
-            self.tree.delete(*self.tree.get_children())
-            for log in logger.get_log():
-                self.tree.insert(
-                    "",
-                    "end",
-                    values=(
-                        log["iter"],
-                        f"{log['f_x']:.6f}",
-                        f"{log['norm_grad']:.6f}",
-                        f"{log['alpha']:.6f}" if log["alpha"] else "-",
-                    ),
-                )
-
-            self.ax.clear()
-            fx_vals = [log["f_x"] for log in logger.get_log()]
-            iterations = [log["iter"] for log in logger.get_log()]
-            self.ax.plot(iterations, fx_vals, marker="o", linestyle="-")
-            self.ax.set_title("Convergence of f(x)")
-            self.ax.set_xlabel("Iteration")
-            self.ax.set_ylabel("f(x)")
-            self.ax.grid(True)
-            self.canvas.draw()
-
-            self.ax2.clear()
-            grad_vals = [log["norm_grad"] for log in logger.get_log()]
-            self.ax2.plot(
-                iterations, grad_vals, marker="o", linestyle="-", color="orange"
+            f = counting(compiled.array_function, eval_count, "f")
+            grad_f = counting(compiled.array_gradient, eval_count, "grad")
+            value_and_grad = counting(
+                compiled.array_value_and_grad, eval_count, "f", "grad"
             )
-            self.ax2.set_title("Convergence of ‖∇f(x)‖")
-            self.ax2.set_xlabel("Iteration")
-            self.ax2.set_ylabel("‖∇f‖")
-            self.ax2.grid(True)
-            self.canvas2.draw()
-
-            x = [log["f_x"] for log in logger.get_log()]
-            y = [log["norm_grad"] for log in logger.get_log()]
-
-            self.iteration_points = [x, y]
-            self.point = np.round(x_opt, 6)
-            solution_text = f"Punto óptimo encontrado: {np.round(x_opt, 6)}"
-            self.stats_label.config(
-                text=solution_text
-                + f"\n⏱️ Time: {elapsed:.4f}s | f(x) calls: {eval_count['f']} | ∇f(x) calls: {eval_count['grad']}"
+            if method_name == "newton_cg":
+                options["hvp"] = compiled.array_hvp  # None: diferencias de ∇f
+            start_time = time.perf_counter()
+            x_opt, _ = METHODS[method_name](
+                f,
+                grad_f,
+                x0,
+                callback=callback,
+                value_and_grad=value_and_grad,
+                record="none",
+                **options,
             )
+            return {
+                "x_opt": x_opt,
+                "time": time.perf_counter() - start_time,
+                "f_evals": eval_count["f"],
+                "grad_evals": eval_count["grad"],
+            }
+
+        # Una ejecución anterior se cancela y termina sola: su cola ya no se lee
+        if self.worker is not None:
+            self.worker.cancel()
+        self._reset_progress()
+        self.stats_label.config(text="⏳ Running...")
+        self.cancel_button.state(["!disabled"])
+        self.worker = OptimizationWorker(run).start()
+        self.after(POLL_INTERVAL_MS, self._poll_worker, self.worker)
+
+    def cancel_optimization(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def _poll_worker(self, worker):
+        if worker is not self.worker:
+            return
 
-        except Exception as e:
-            messagebox.showerror("Error", f"{type(e).__name__}: {str(e)}")
+        received = False
+        for kind, payload in worker.poll():
+            if kind == "iterations":
+                for k, x, f_x, norm_grad, alpha, info in payload:
+                    self.logger(k, x, f_x, None, norm_grad, alpha, **info)
+                received = True
+            elif kind == "error":
+                self._finish_worker()
+                messagebox.showerror("Error", f"{type(payload).__name__}: {payload}")
+                return
+            else:
+                self._update_progress(final=True)
+                self._finish_worker()
+                self._show_result(payload, worker.cancelled)
+                return
+
+        if received:
+            self._update_progress()
+        self.after(POLL_INTERVAL_MS, self._poll_worker, worker)
+
+    def _finish_worker(self):
+        self.worker = None
+        self.cancel_button.state(["disabled"])
+
+    def _reset_progress(self):
+        self.build_figures()
+        self.table.clear()
+        self.fx_plot.reset()
+        self.grad_plot.reset()
+
+    def _update_progress(self, final=False):
+        logger = self.logger
+        iterations = logger.iter
+        self.table.set_data(iterations, logger.f_x, logger.norm_grad, logger.alpha)
+        self.fx_plot.update(iterations, logger.f_x, final)
+        self.grad_plot.update(iterations, logger.norm_grad, final)
+
+    def _show_result(self, result, cancelled):
+        x_opt = result["x_opt"]
+        points = self.logger.x  # puntos x retenidos por iteración
+        # None si no se registró ninguna iteración (max_iter=0 o cancelación)
+        self.trajectory = None if points is None else points.copy()
+        self.point = np.round(x_opt, 6)
+        solution_text = f"Punto óptimo encontrado: {np.round(x_opt, 6)}"
+        if cancelled:
+            solution_text += " (cancelado)"
+        self.stats_label.config(
+            text=solution_text
+            + f"\n⏱️ Time: {result['time']:.4f}s | f(x) calls: {result['f_evals']} | ∇f(x) calls: {result['grad_evals']}"
+        )
 
     def on_show_3d_plot(self):
         func_str = self.func_entry.get()
         variables = [v.strip() for v in self.vars_entry.get().split(",")]
 
-        show_3d_plot(self, func_str, variables)
+        show_3d_plot(self, func_str, variables, point=getattr(self, "point", None))
 
     def on_show_3d_plot_points(self):
         func_str = self.func_entry.get()
         variables = [v.strip() for v in self.vars_entry.get().split(",")]
 
-        if hasattr(self, "iteration_points"):
-            show_3d_plot(self, func_str, variables, self.iteration_points)
+        if hasattr(self, "trajectory"):
+            show_3d_plot(self, func_str, variables, self.trajectory)
 
     def on_show_contour_plot(self):
         func_str = self.func_entry.get()
         variables = [v.strip() for v in self.vars_entry.get().split(",")]
 
         if hasattr(self, "point"):
-            contour_plot(self, func_str, variables, self.point)
+            contour_plot(self, func_str, variables, self.point, self.trajectory)
         else:
             contour_plot(self, func_str, variables)
 
@@ -1,10 +1,21 @@
+import atexit
 import os
+import shutil
 import sys
+import tempfile
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# Caché de código propia de esta ejecución: las pruebas no escriben en la del
+# usuario ni dependen de lo que tenga (los procesos hijos heredan la variable)
+os.environ["OPTIMIZATION_CODE_CACHE"] = tempfile.mkdtemp()
+atexit.register(shutil.rmtree, os.environ["OPTIMIZATION_CODE_CACHE"], True)
+
 import numpy as np
 
+from cli import load_jobs
+from core import codecache
+from core.evaluation import array_native
 from core.functions import (
     ackley,
     griewank,
@@ -13,10 +24,24 @@ from core.functions import (
     rastrigin,
     rosenbrock,
 )
-from core.gradients import symbolic_function, symbolic_gradient
+from core.gradients import (
+    cache_info,
+    compile_objective,
+    invalidate_cache,
+    symbolic_array_functions,
+    symbolic_function,
+    symbolic_gradient,
+    symbolic_value_and_grad,
+)
 from core.line_search import armijo_backtracking, wolfe_line_search
 from core.logger import OptimizerLogger
-from core.optimizers import adam, bfgs, gradient_descent
+from core.multistart import multistart_gradient_descent, random_starts
+from core.numdiff import numerical_gradient, numerical_value_and_grad
+from core.optimizers import adam, bfgs, gradient_descent, lbfgs, newton_cg
+from core.parallel import run_jobs, run_parallel, sweep
+from core.plotting import minmax_downsample, refinement_window, simplify_path
+from core.problems import PROBLEMS, get_problem
+from core.runner import run_job
 from core.stochastic import stochastic_gradient_descent
 from core.utils import parse_input_vector
 
@@ -194,7 +219,7 @@ x_opt, history = adam(
     x0=x0,
     tol=1e-6,
     max_iter=1000,
-    alpha=0.05,  # tasa de aprendizaje
+    learning_rate=0.05,
 )
 
 print(f"Iteraciones: {len(history)}")
@@ -218,7 +243,7 @@ x_opt, history = stochastic_gradient_descent(
     f=f,
     grad_f=grad_f,
     x0=x0,
-    step_size=0.1,
+    learning_rate=0.1,
     noise_scale=1e-2,
     tol=1e-5,
     max_iter=200,
@@ -227,3 +252,571 @@ x_opt, history = stochastic_gradient_descent(
 print(f"Iteraciones: {len(history)}")
 print(f"x óptimo ≈ {x_opt}")
 print(f"f(x) ≈ {f(*x_opt):.6f} (Expected ≈ 0)")
+
+# Test 16: value_and_grad fusionado (CSE)
+print("\n🔹 Test: value_and_grad fusionado (Rosenbrock 2D)")
+
+rosen_str = "100*(y - x**2)**2 + (1 - x)**2"
+vars = ["x", "y"]
+f_rosen = symbolic_function(rosen_str, vars)
+grad_rosen = symbolic_gradient(rosen_str, vars)
+value_and_grad = symbolic_value_and_grad(rosen_str, vars)
+
+f_val, grad_val = value_and_grad(-1.0, 1.0)
+assert f_val == 4.0 and np.allclose(grad_val, [-4.0, 0.0])
+print(f"f(-1,1) = {f_val}, ∇f(-1,1) = {grad_val}")
+
+x_opt, history = bfgs(
+    f=f_rosen,
+    grad_f=grad_rosen,
+    x0=np.array([-1.0, 1.0]),
+    tol=1e-6,
+    max_iter=200,
+    line_search=wolfe_line_search,
+    value_and_grad=value_and_grad,
+)
+
+assert np.allclose(x_opt, [1.0, 1.0], atol=1e-5)
+print(f"Iteraciones: {len(history)}, x óptimo ≈ {x_opt}")
+
+# Test 17: Forma nativa sobre arreglos (gradiente en arreglo preasignado)
+print("\n🔹 Test: Forma nativa sobre arreglos")
+
+value, gradient, value_and_grad = symbolic_array_functions(rosen_str, vars)
+out = np.empty(2)
+gradient(np.array([-1.0, 1.0]), out)
+assert value(np.array([-1.0, 1.0])) == 4.0 and np.allclose(out, [-4.0, 0.0])
+print(f"f(-1,1) = {value(np.array([-1.0, 1.0]))}, ∇f(-1,1) = {out}")
+
+x_opt, history = gradient_descent(
+    f=value,
+    grad_f=gradient,
+    x0=np.array([-1.0, 1.0]),
+    tol=1e-6,
+    max_iter=2000,
+    line_search=armijo_backtracking,
+    value_and_grad=value_and_grad,
+)
+
+assert np.allclose(x_opt, [1.0, 1.0], atol=1e-3)
+print(f"Iteraciones: {len(history)}, x óptimo ≈ {x_opt}")
+
+# Test 18: Multi-arranque por lotes (Himmelblau)
+print("\n🔹 Test: Multi-arranque por lotes (Himmelblau)")
+
+compiled = compile_objective("(x**2 + y - 11)**2 + (x + y**2 - 7)**2", ["x", "y"])
+X0 = random_starts(1000, 2, seed=0)
+result = multistart_gradient_descent(
+    compiled.batch_function,
+    compiled.batch_gradient,
+    X0,
+    max_iter=500,
+    line_search="armijo",
+    value_and_grad=compiled.batch_value_and_grad,
+)
+
+assert result["converged"].all() and result["best_f"] < 1e-10
+print(f"Arranques convergidos: {result['converged'].sum()} de {len(X0)}")
+print(f"Mejor f(x) ≈ {result['best_f']:.6f}")
+
+# Test 19: Problemas registrados con gradiente analítico
+print("\n🔹 Test: Rosenbrock (n=100) con gradiente analítico y L-BFGS")
+
+problem = get_problem("rosenbrock")
+x0 = np.full(100, -1.0)
+x0[::2] = -1.2
+x_opt, history = lbfgs(
+    problem.function,
+    problem.gradient,
+    x0,
+    tol=1e-6,
+    max_iter=500,
+    line_search=wolfe_line_search,
+    value_and_grad=problem.value_and_grad,
+)
+
+assert problem.function(x_opt) < 1e-10
+print(f"Iteraciones: {len(history)}, f(x) ≈ {problem.function(x_opt):.6f}")
+
+# Test 20: Historial con memoria acotada (buffer circular y espaciado logarítmico)
+print("\n🔹 Test: Políticas de retención del historial")
+
+problem = get_problem("rosenbrock")
+logger = OptimizerLogger(retention="log:10")
+x_opt, history = gradient_descent(
+    problem.function,
+    problem.gradient,
+    np.zeros(10),
+    max_iter=5000,
+    step_size=1e-3,
+    callback=logger,
+    retention="last:100",
+)
+
+assert history.total == 5000 and len(history) == 100
+assert len(logger) < 50 and logger.iter[-1] == 5000
+print(f"Iteraciones: {history.total}, guardadas: {len(history)}")
+print(f"Filas en el logger: {len(logger)}, últimas: {logger.iter[-3:]}")
+
+x_opt, history = gradient_descent(
+    problem.function,
+    problem.gradient,
+    np.zeros(10),
+    max_iter=53,
+    step_size=1e-3,
+    retention="every:7",
+)
+entries = list(history)  # la última iteración queda fuera del espaciado
+assert [history[i][0] for i in range(len(history))] == [e[0] for e in entries]
+assert history[-1][0] == 53 and history[-2][0] == entries[-2][0]
+assert [e[0] for e in history[1:3]] == [e[0] for e in entries[1:3]]
+print(f"Acceso por índice: {[history[i][0] for i in range(len(history))]}")
+
+# Test 21: Modo record="none" (solo el x final, sin trayectoria)
+print("\n🔹 Test: BFGS sin registro de trayectoria")
+
+x_opt, history = bfgs(
+    problem.function,
+    problem.gradient,
+    np.zeros(10),
+    line_search=wolfe_line_search,
+    value_and_grad=problem.value_and_grad,
+    record="none",
+)
+
+assert len(history) == 0 and not history and history.total > 0
+assert problem.function(x_opt) < 1e-10
+print(f"Iteraciones: {history.total}, f(x) ≈ {problem.function(x_opt):.6f}")
+
+# Test 22: Backends de gradiente (sympy, autodiff y diferencias finitas)
+print("\n🔹 Test: Ackley con gradiente por autodiff y diferencias finitas")
+
+x0 = np.array([0.3, -0.4])
+for backend in ("sympy", "autodiff", "finite-diff"):
+    compiled = compile_objective(ackley_str, ["x", "y"], backend)
+    x_opt, history = bfgs(
+        compiled.array_function,
+        compiled.array_gradient,
+        x0,
+        line_search=wolfe_line_search,
+        value_and_grad=compiled.array_value_and_grad,
+        record="none",
+    )
+    assert np.allclose(x_opt, [0.0, 0.0], atol=1e-8), backend
+    print(f"{backend}: x_opt = {x_opt}, iteraciones: {history.total}")
+
+# Test 23: Objetivo de caja negra con gradiente numérico
+print("\n🔹 Test: BFGS sobre una función de caja negra (paso complejo)")
+
+
+@array_native
+def black_box(x):
+    return np.sum(100 * (x[1:] - x[:-1] ** 2) ** 2 + (1 - x[:-1]) ** 2)
+
+
+x_opt, history = bfgs(
+    black_box,
+    numerical_gradient(black_box, method="complex", workers=1),
+    np.zeros(5),
+    line_search=wolfe_line_search,
+    value_and_grad=numerical_value_and_grad(black_box, method="complex", workers=1),
+    record="none",
+)
+assert np.allclose(x_opt, np.ones(5), atol=1e-6)
+print(f"x_opt = {x_opt}, iteraciones: {history.total}")
+
+# Test 24: Newton-CG con productos Hessiana-vector (analítico y simbólico)
+print("\n🔹 Test: Newton-CG en Rosenbrock (n=10000)")
+
+problem = get_problem("rosenbrock")
+x_opt, history = newton_cg(
+    problem.function,
+    problem.gradient,
+    np.full(10000, 1.5),
+    hvp=problem.hvp,
+    line_search=wolfe_line_search,
+    value_and_grad=problem.value_and_grad,
+    record="none",
+)
+assert problem.function(x_opt) < 1e-10
+print(f"Iteraciones: {history.total}, f(x) ≈ {problem.function(x_opt):.6f}")
+
+compiled = compile_objective(rosen_str, ["x", "y"])
+x_opt, history = newton_cg(
+    compiled.array_function,
+    compiled.array_gradient,
+    np.array([-1.2, 1.0]),
+    hvp=compiled.array_hvp,
+    line_search=wolfe_line_search,
+    value_and_grad=compiled.array_value_and_grad,
+)
+assert np.allclose(x_opt, [1.0, 1.0], atol=1e-6)
+print(f"Newton-CG simbólico: x_opt = {x_opt}, iteraciones: {history.total}")
+
+# Test 25: Hessianas dispersas por coloreo de columnas
+print("\n🔹 Test: Newton-CG con Hessiana dispersa en Rosenbrock (n=100000)")
+
+problem = get_problem("rosenbrock")
+hessian = problem.sparse_hessian(100000)
+x_opt, history = newton_cg(
+    problem.function,
+    problem.gradient,
+    np.full(100000, 1.5),
+    hessian=hessian,
+    line_search=wolfe_line_search,
+    value_and_grad=problem.value_and_grad,
+    record="none",
+)
+assert hessian.n_colors == 3 and problem.function(x_opt) < 1e-10
+print(f"Colores: {hessian.n_colors}, iteraciones: {history.total}")
+
+compiled = compile_objective(rosen_str, ["x", "y"])
+x = np.array([-1.2, 1.0])
+dense = np.column_stack([compiled.array_hvp(x, e) for e in np.eye(2)])
+assert np.allclose(compiled.sparse_hessian(x).toarray(), dense)
+print("Hessiana CSR simbólica = Hessiana densa")
+
+# Test 26: caché en disco del código generado
+print("\n🔹 Test: Caché en disco del código generado")
+
+settings = codecache.code_cache_info()
+with tempfile.TemporaryDirectory() as directory:
+    codecache.set_code_cache(directory)
+    invalidate_cache()
+    compiled = compile_objective(rosen_str, ["x", "y"])
+    f_first = compiled.array_function(np.array([-1.2, 1.0]))
+    entries = codecache.code_cache_info()["entries"]
+    invalidate_cache()
+    # Fallo de la caché LRU: el código se importa desde disco
+    compiled = compile_objective(rosen_str, ["x", "y"])
+    f_disk = compiled.array_function(np.array([-1.2, 1.0]))
+    assert entries == 1 and f_first == f_disk
+    codecache.evict(max_bytes=1)
+    assert codecache.code_cache_info()["entries"] == 0
+    print(f"Entradas en disco: {entries}, f igual tras recargar desde disco")
+    codecache.set_code_cache(settings["directory"], settings["max_bytes"])
+
+# Test 27: L-BFGS descarta un par (s, y) sin curvatura sin pisar el buffer
+print("\n🔹 Test: L-BFGS con par rechazado tras llenar el buffer")
+
+A = np.diag([1.0, 3.0, -0.5])  # indefinida: algunos pasos tienen sᵀy < 0
+
+
+@array_native
+def indefinite_quadratic(x):
+    return 0.5 * x @ A @ x
+
+
+@array_native
+def indefinite_gradient(x, out=None):
+    if out is None:
+        return A @ x
+    np.dot(A, x, out=out)
+    return out
+
+
+points, gradients = [], []
+
+
+def record_iterate(k, x, f_x, grad, norm_grad, alpha, **info):
+    points.append(x.copy())
+    gradients.append(grad.copy())
+
+
+lbfgs(
+    indefinite_quadratic,
+    indefinite_gradient,
+    np.array([1.0, 1.0, 0.1]),
+    m=2,
+    max_iter=8,
+    callback=record_iterate,
+)
+
+# Referencia: dirección de dos bucles con los últimos m pares aceptados
+accepted, rejected_after_wrap = [], False
+for k in range(len(points) - 1):
+    q = gradients[k].copy()
+    pairs = accepted[-2:]
+    coefficients = []
+    for s, y in reversed(pairs):
+        coefficients.append((s @ q) / (s @ y))
+        q -= coefficients[-1] * y
+    if pairs:
+        s, y = pairs[-1]
+        q *= (s @ y) / (y @ y)
+    for (s, y), a in zip(pairs, reversed(coefficients)):
+        q += (a - (y @ q) / (s @ y)) * s
+    assert np.allclose(points[k + 1] - points[k], -q), f"dirección errónea en k={k}"
+
+    s, y = points[k + 1] - points[k], gradients[k + 1] - gradients[k]
+    if s @ y > 1e-10 * np.linalg.norm(s) * np.linalg.norm(y):
+        accepted.append((s, y))
+    elif len(accepted) >= 2:
+        rejected_after_wrap = True
+assert rejected_after_wrap
+print("Direcciones iguales a la referencia tras un par rechazado")
+
+try:
+    lbfgs(indefinite_quadratic, indefinite_gradient, np.ones(3), m=0)
+except ValueError as error:
+    print(f"m=0 rechazado: {error}")
+else:
+    raise AssertionError("lbfgs aceptó m=0")
+
+# Test 28: callbacks clásicos de 6 argumentos siguen funcionando en BFGS
+print("\n🔹 Test: BFGS con callback de 6 argumentos")
+
+problem = get_problem("rosenbrock")
+seen = []
+
+
+def classic_callback(k, x, f_x, grad, norm_grad, alpha):
+    seen.append(k)
+
+
+def counting_callback(k, x, f_x, grad, norm_grad, alpha, skipped_updates=0):
+    seen.append(skipped_updates)
+
+
+for callback in (classic_callback, counting_callback):
+    bfgs(
+        problem.function,
+        problem.gradient,
+        np.array([-1.2, 1.0]),
+        max_iter=5,
+        callback=callback,
+    )
+assert seen[:5] == [1, 2, 3, 4, 5] and len(seen) == 10
+print("Callbacks sin **info aceptados")
+
+# Test 29: callbacks clásicos de 6 argumentos siguen funcionando en Newton-CG
+print("\n🔹 Test: Newton-CG con callback de 6 argumentos")
+
+seen = []
+newton_cg(
+    problem.function,
+    problem.gradient,
+    np.array([-1.2, 1.0]),
+    hvp=problem.hvp,
+    max_iter=5,
+    callback=classic_callback,
+)
+assert seen == [1, 2, 3, 4, 5]
+print("Callback sin **info aceptado")
+
+# Test 30: invalidate_cache con solo la expresión elimina sus entradas
+print("\n🔹 Test: invalidate_cache sin variables")
+
+invalidate_cache()
+compile_objective("x**2 + y**2", ["x", "y"])
+compile_objective("x**2 + y**2", ["x", "y"], "autodiff")
+compile_objective("x**2 + z", ["x", "z"])
+invalidate_cache("x**2+y**2")
+assert cache_info()["size"] == 1
+invalidate_cache("x**2 + z", ["x", "y"])  # otras variables: no coincide
+assert cache_info()["size"] == 1
+invalidate_cache("x**2 + z", ["x", "z"])
+assert cache_info()["size"] == 0
+print("Entradas de la expresión eliminadas")
+
+# Test 31: Max y Min en el código generado (importan functools)
+print("\n🔹 Test: Expresiones con Max y Min")
+
+invalidate_cache()
+compiled = compile_objective("Max(x, y) + Min(x, y)*x + x**2", ["x", "y"])
+assert compiled.function(1.0, 2.0) == 4.0
+assert np.allclose(compiled.gradient(1.0, 2.0), [4.0, 1.0])
+assert np.allclose(
+    compiled.array_hvp(np.array([1.0, 2.0]), np.array([1.0, 0.0])), [4.0, 0.0]
+)
+assert np.allclose(
+    compiled.batch_function(np.array([[1.0, 2.0], [3.0, -1.0]])), [4.0, 9.0]
+)
+print(f"f(1, 2) = {compiled.function(1.0, 2.0)}, ∇f = {compiled.gradient(1.0, 2.0)}")
+
+# Test 32: diferencias finitas con expresiones que autodiff no sabe derivar
+print("\n🔹 Test: Backend finite-diff con atan2 y Max")
+
+compiled = compile_objective("atan2(y, x) + Max(x, y)**2", ["x", "y"], "finite-diff")
+f_x, grad = compiled.value_and_grad(1.0, 2.0)
+assert np.isclose(f_x, np.arctan2(2.0, 1.0) + 4.0)
+assert np.allclose(grad, [-0.4, 4.2], atol=1e-6)
+print(f"f(1, 2) = {f_x:.6f}, ∇f ≈ {grad}")
+
+# Test 33: funciones vectorizadas sobre un lote = llamadas por punto
+print("\n🔹 Test: Lotes (m, n) iguales a evaluar fila por fila")
+
+rng = np.random.default_rng(0)
+for name, (function, gradient, _, dimension, _) in PROBLEMS.items():
+    X = rng.uniform(-2, 2, size=(6, dimension or 5))
+    assert np.allclose(function(X), [function(row) for row in X]), name
+    assert np.allclose(gradient(X), [gradient(row) for row in X]), name
+
+# Valores de las definiciones originales (por componente)
+assert np.isclose(rosenbrock(np.array([-1.2, 1.0])), 24.2)
+assert np.isclose(rastrigin(np.array([1.0, 1.0])), 2.0)
+assert np.isclose(himmelblau(np.array([0.0, 0.0])), 170.0)
+assert np.isclose(ackley(np.array([1.0, 1.0])), 20 - 20 * np.exp(-0.2))
+assert np.isclose(
+    griewank(np.array([1.0, 1.0])), 1 + 2 / 4000 - np.cos(1) * np.cos(1 / np.sqrt(2))
+)
+print(f"{len(PROBLEMS)} funciones: lote = bucle por filas")
+
+# Test 34: BFGS con pasos sin curvatura (curvature="skip" y "damp")
+print("\n🔹 Test: BFGS con sᵀy ≤ 0 (omitir o amortiguar)")
+
+runs = {}
+for curvature in ("skip", "damp"):
+    points, gradients, skipped = [], [], []
+
+    def record_skips(k, x, f_x, grad, norm_grad, alpha, skipped_updates=0):
+        points.append(x.copy())
+        gradients.append(grad.copy())
+        skipped.append(skipped_updates)
+
+    bfgs(
+        indefinite_quadratic,
+        indefinite_gradient,
+        np.array([1.0, 1.0, 0.1]),
+        max_iter=10,
+        callback=record_skips,
+        curvature=curvature,
+    )
+    runs[curvature] = points, gradients, skipped
+
+# skip: se reconstruye H con los pares aceptados; cada paso es -H ∇f y H
+# sigue siendo simétrica definida positiva tras cada actualización omitida
+points, gradients, skipped = runs["skip"]
+assert skipped[-1] > 0 and skipped == sorted(skipped)
+H, scaled = np.eye(3), False
+for k in range(len(points) - 1):
+    assert np.allclose(points[k + 1] - points[k], -H @ gradients[k])
+    s, y = points[k + 1] - points[k], gradients[k + 1] - gradients[k]
+    if not scaled and s @ y > 0:
+        H *= (s @ y) / (y @ y)
+        scaled = True
+    if s @ y > 1e-10 * np.linalg.norm(s) * np.linalg.norm(y):
+        V = np.eye(3) - np.outer(y, s) / (s @ y)
+        H = V.T @ H @ V + np.outer(s, s) / (s @ y)
+    assert np.allclose(H, H.T) and np.linalg.eigvalsh(H).min() > 0
+
+# damp: ninguna actualización se omite y todos los pasos son de descenso
+points, gradients, skipped = runs["damp"]
+assert len(points) == 10 and skipped[-1] == 0
+for k in range(len(points) - 1):
+    assert (points[k + 1] - points[k]) @ gradients[k] < 0
+print(f"Omitidas con skip: {runs['skip'][2][-1]}, con damp: {skipped[-1]}")
+
+# Test 35: barrido de hiperparámetros en este proceso y en un pool
+print("\n🔹 Test: sweep y run_jobs / run_parallel")
+
+base_job = {
+    "expression": "x**2 + y**2",
+    "variables": ["x", "y"],
+    "method": "gradient_descent",
+    "x0": [1.0, 1.0],
+    "options": {"tol": 1e-12},
+}
+jobs = sweep(
+    base_job, x0_list=[[1.0, 1.0], [2.0, -1.0]], step_size=[0.1, 0.25], max_iter=[3, 7]
+)
+jobs.append({**base_job, "method": "newton"})  # método desconocido
+assert len(jobs) == 9 and jobs[1]["options"] == {
+    "tol": 1e-12,
+    "step_size": 0.1,
+    "max_iter": 7,
+}
+assert jobs[4]["x0"] == [2.0, -1.0]
+
+results = list(run_jobs(jobs, max_workers=1))
+assert [r["index"] for r in results] == list(range(9))
+assert all(r["worker"] == os.getpid() for r in results)
+assert [r["iterations"] for r in results[:-1]] == [3, 7] * 4
+for job, result in zip(jobs[:-1], results):
+    assert result["x_opt"] == run_job(job)["x_opt"]
+assert results[-1]["error"].startswith("ValueError")
+
+pooled = sorted(run_parallel(jobs, max_workers=2), key=lambda r: r["index"])
+assert [r["index"] for r in pooled] == list(range(9))
+assert all(r["worker"] != os.getpid() for r in pooled)
+assert [r.get("x_opt") for r in pooled] == [r.get("x_opt") for r in results]
+print(f"{len(jobs)} trabajos: mismos resultados en el proceso y con 2 procesos")
+
+# Test 36: archivos de trabajos JSON y TOML con [defaults]
+print("\n🔹 Test: load_jobs con valores por defecto (JSON y TOML)")
+
+jobs_json = """{
+  "defaults": {"method": "bfgs", "line_search": "wolfe", "options": {"tol": 1e-8}},
+  "jobs": [
+    {"id": "a", "function": "rosenbrock", "x0": [-1.2, 1.0]},
+    {"id": "b", "function": "himmelblau", "x0": [0.0, 0.0],
+     "method": "lbfgs", "options": {"max_iter": 50}}
+  ]
+}"""
+jobs_toml = """[defaults]
+method = "bfgs"
+line_search = "wolfe"
+options = { tol = 1e-8 }
+
+[[jobs]]
+id = "a"
+function = "rosenbrock"
+x0 = [-1.2, 1.0]
+
+[[jobs]]
+id = "b"
+function = "himmelblau"
+x0 = [0.0, 0.0]
+method = "lbfgs"
+options = { max_iter = 50 }
+"""
+with tempfile.TemporaryDirectory() as directory:
+    loaded = []
+    for name, text in (("jobs.json", jobs_json), ("jobs.toml", jobs_toml)):
+        path = os.path.join(directory, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        loaded.append(load_jobs(path))
+
+assert loaded[0] == loaded[1]
+first, second = loaded[0]
+assert first["method"] == "bfgs" and first["options"] == {"tol": 1e-8}
+assert second["method"] == "lbfgs" and second["line_search"] == "wolfe"
+assert second["options"] == {"tol": 1e-8, "max_iter": 50}
+print(f"JSON = TOML: {[job['id'] for job in loaded[0]]}")
+
+# Test 37: simplificación de trayectorias y ventana de refinamiento
+print("\n🔹 Test: simplify_path y refinement_window")
+
+t = np.linspace(0, 4 * np.pi, 2000)
+spiral = np.column_stack([t * np.cos(t), t * np.sin(t)])
+kept = simplify_path(spiral, budget=100)
+assert len(kept) == 100 and kept[0] == 0 and kept[-1] == len(spiral) - 1
+assert np.all(np.diff(kept) > 0)
+line = np.column_stack([np.linspace(-3, 5, 1000), np.linspace(1, -2, 1000)])
+assert list(simplify_path(line, budget=100)) == [0, 999]
+
+x_range, y_range = (-5, 5), (-10, 10)
+window = refinement_window(spiral, x_range, y_range)  # la espiral se sale del rango
+(x0, x1), (y0, y1) = window
+assert x_range[0] <= x0 < x1 <= x_range[1] and y_range[0] <= y0 < y1 <= y_range[1]
+(x0, x1), (y0, y1) = refinement_window([[4.9, -9.9]], x_range, y_range)
+assert x0 < 4.9 <= x1 <= 5 and -10 <= y0 <= -9.9 < y1
+assert refinement_window([[20.0, 0.0]], x_range, y_range) is None
+print(f"Espiral: {len(spiral)} -> {len(kept)} puntos, recta: 2 puntos")
+
+# Test 38: reducción min-max de curvas largas
+print("\n🔹 Test: minmax_downsample")
+
+rng = np.random.default_rng(1)
+y = np.cumsum(rng.normal(size=10_007))
+x = np.arange(len(y))
+for buckets in (1, 7, 300):
+    x_small, y_small = minmax_downsample(x, y, buckets)
+    assert len(x_small) <= 2 * buckets + 2 and np.all(np.diff(x_small) > 0)
+    assert y_small.min() == y.min() and y_small.max() == y.max()
+    assert x_small[0] == 0 and x_small[-1] == len(y) - 1
+    assert np.array_equal(y[x_small], y_small)
+x_small, y_small = minmax_downsample(x[:50], y[:50], 300)
+assert len(x_small) == 50  # ya cabe: se devuelve sin cambios
+print(f"{len(y)} puntos -> {len(minmax_downsample(x, y, 300)[0])} con 300 grupos")